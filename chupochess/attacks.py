@@ -0,0 +1,134 @@
+from typing import List, Tuple
+from chupochess.common import PieceColor
+
+# precomputed attack tables, indexed by square index (see Location.index)
+# *_TARGETS[index] is a tuple of target square indices, *_ATTACKS[index] the same set as bitboard
+
+KNIGHT_OFFSETS = [(-2,1),(-1,2),(1,2),(2,1),(2,-1),(1,-2),(-1,-2),(-2,-1)]     # (file, rank)
+KING_OFFSETS = [(0, 1), (1, 1), (1, 0), (1, -1), (0,-1), (-1, -1), (-1, 0), (-1, 1)]
+PAWN_OFFSETS = {
+    PieceColor.WHITE: [(-1,1),(1,1)],
+    PieceColor.BLACK: [(-1,-1),(1,-1)]
+}
+
+def iterBits(bb: int):
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+def firstBlocker(direction: int, blockers: int) -> int:
+    # index of the closest of the 'blockers' on a ray walking in 'direction'
+    if direction % 2 == 0:
+        return (blockers & -blockers).bit_length() - 1
+    return blockers.bit_length() - 1
+
+def _buildTargets(offsets: List[Tuple[int,int]]) -> List[Tuple[int, ...]]:
+    table = []
+    for index in range(64):
+        rank, file = index >> 3, index & 7
+        targets = []
+        for offset in offsets:
+            if 0 <= file + offset[0] < 8 and 0 <= rank + offset[1] < 8:
+                targets.append((rank + offset[1]) * 8 + file + offset[0])
+        table.append(tuple(targets))
+    return table
+
+def _toBitboards(table: List[Tuple[int, ...]]) -> List[int]:
+    bitboards = []
+    for targets in table:
+        bb = 0
+        for target in targets:
+            bb |= 1 << target
+        bitboards.append(bb)
+    return bitboards
+
+KNIGHT_TARGETS = _buildTargets(KNIGHT_OFFSETS)
+KNIGHT_ATTACKS = _toBitboards(KNIGHT_TARGETS)
+KING_TARGETS = _buildTargets(KING_OFFSETS)
+KING_ATTACKS = _toBitboards(KING_TARGETS)
+# PAWN_TARGETS[color.value][index]: squares attacked by a pawn of 'color' on 'index'
+PAWN_TARGETS = [_buildTargets(PAWN_OFFSETS[color]) for color in PieceColor]
+PAWN_ATTACKS = [_toBitboards(table) for table in PAWN_TARGETS]
+
+# sliding pieces:
+# RAYS[direction][index] holds the squares in walking order, RAY_MASKS the same as bitboard
+DIRECTIONS = [(0,1), (0,-1), (1,0), (-1,0), (1,1), (-1,-1), (-1,1), (1,-1)]           # N, S, E, W, NE, SW, NW, SE
+# even directions walk towards higher square indices -> the closest blocker on a ray is its lowest bit, otherwise its highest bit
+# lines through a square, each made of two opposite directions: file, rank, diagonal, anti-diagonal
+LINE_DIRECTIONS = [(0, 1), (2, 3), (4, 5), (6, 7)]
+
+def _buildRays(offset: Tuple[int,int]) -> List[Tuple[int, ...]]:
+    table = []
+    for index in range(64):
+        rank, file = (index >> 3) + offset[1], (index & 7) + offset[0]
+        ray = []
+        while 0 <= file < 8 and 0 <= rank < 8:
+            ray.append(rank * 8 + file)
+            rank, file = rank + offset[1], file + offset[0]
+        table.append(tuple(ray))
+    return table
+
+RAYS = [_buildRays(offset) for offset in DIRECTIONS]
+RAY_MASKS = [_toBitboards(table) for table in RAYS]
+
+def _buildLineTables(line: Tuple[int,int]) -> Tuple[List[int], List[dict]]:
+    # occupancy-indexed attack tables per square: LINE_ATTACKS[line][index][occupied & LINE_OCCUPANCY_MASKS[line][index]]
+    masks = []
+    tables = []
+    for index in range(64):
+        rays = [RAYS[direction][index] for direction in line]
+        mask = 0
+        for ray in rays:
+            for target in ray[:-1]:         # the last square of a ray never blocks anything
+                mask |= 1 << target
+        table = {}
+        subset = 0
+        while True:
+            attacks = 0
+            for ray in rays:
+                for target in ray:
+                    attacks |= 1 << target
+                    if subset & (1 << target):
+                        break
+            table[subset] = attacks
+            subset = (subset - mask) & mask     # enumerate all subsets of mask (carry-rippler)
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+LINE_OCCUPANCY_MASKS = []
+LINE_ATTACKS = []
+for _line in LINE_DIRECTIONS:
+    _masks, _tables = _buildLineTables(_line)
+    LINE_OCCUPANCY_MASKS.append(_masks)
+    LINE_ATTACKS.append(_tables)
+
+def rookAttacks(index: int, occupied: int) -> int:
+    return LINE_ATTACKS[0][index][occupied & LINE_OCCUPANCY_MASKS[0][index]] \
+        | LINE_ATTACKS[1][index][occupied & LINE_OCCUPANCY_MASKS[1][index]]
+
+def bishopAttacks(index: int, occupied: int) -> int:
+    return LINE_ATTACKS[2][index][occupied & LINE_OCCUPANCY_MASKS[2][index]] \
+        | LINE_ATTACKS[3][index][occupied & LINE_OCCUPANCY_MASKS[3][index]]
+
+def queenAttacks(index: int, occupied: int) -> int:
+    return rookAttacks(index, occupied) | bishopAttacks(index, occupied)
+
+# square pairs: BETWEEN[a][b] are the squares strictly between a and b, LINES[a][b] the full line through
+# both (incl. a and b), DIRECTION[a][b] the direction from a to b; all 0/None if a and b are not aligned
+BETWEEN = [[0] * 64 for _ in range(64)]
+LINES = [[0] * 64 for _ in range(64)]
+DIRECTION = [[None] * 64 for _ in range(64)]
+for _line in LINE_DIRECTIONS:
+    for _index in range(64):
+        _fullLine = RAY_MASKS[_line[0]][_index] | RAY_MASKS[_line[1]][_index] | (1 << _index)
+        for _direction in _line:
+            _between = 0
+            for _target in RAYS[_direction][_index]:
+                BETWEEN[_index][_target] = _between
+                LINES[_index][_target] = _fullLine
+                DIRECTION[_index][_target] = _direction
+                _between |= 1 << _target
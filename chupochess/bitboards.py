@@ -0,0 +1,248 @@
+from typing import List
+from chupochess.common import PieceColor, Location, Move, LOCATIONS
+from chupochess.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, LINES, iterBits, bishopAttacks, rookAttacks, queenAttacks
+from chupochess.evaluation import PIECE_VALUES
+
+# square index: A1 = 0, B1 = 1, ..., H8 = 63 (see Location.index)
+FULL = 0xFFFFFFFFFFFFFFFF
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_TYPES = {"P": PAWN, "N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING}
+PIECE_NAMES = ["P", "N", "B", "R", "Q", "K"]
+PROMOTIONS = ["Q", "R", "B", "N"]
+BACK_RANKS = 0xFF | (0xFF << 56)
+# piece values by piece type for the static exchange evaluation, the king can capture but never be exchanged
+EXCHANGE_VALUES = [PIECE_VALUES[name] for name in PIECE_NAMES[:5]] + [20000]
+
+class BitboardPosition:
+    # one bitboard per color and piece type plus occupancy, kept in sync by Board._placePiece / Board._removePiece
+    def __init__(self) -> None:
+        self.pieces = [[0] * 6, [0] * 6]        # [color.value][piece type]
+        self.colors = [0, 0]                    # [color.value]
+        self.occupied = 0
+
+    def add(self, color: PieceColor, name: str, index: int) -> None:
+        bit = 1 << index
+        self.pieces[color.value][PIECE_TYPES[name]] |= bit
+        self.colors[color.value] |= bit
+        self.occupied |= bit
+
+    def remove(self, color: PieceColor, name: str, index: int) -> None:
+        bit = 1 << index
+        self.pieces[color.value][PIECE_TYPES[name]] &= ~bit
+        self.colors[color.value] &= ~bit
+        self.occupied &= ~bit
+
+    def pieceTypeAt(self, index: int, color: int) -> int:
+        bit = 1 << index
+        for pieceType, bb in enumerate(self.pieces[color]):
+            if bb & bit:
+                return pieceType
+        return None
+
+    def attackersTo(self, index: int, color: int, occupied: int = None, removed: int = 0) -> int:
+        # all pieces of 'color' attacking square 'index'; 'removed' masks out captured pieces
+        if occupied is None: occupied = self.occupied
+        pieces = self.pieces[color]
+        keep = FULL ^ removed
+        queens = pieces[QUEEN]
+        return ((PAWN_ATTACKS[1 - color][index] & pieces[PAWN])
+                | (KNIGHT_ATTACKS[index] & pieces[KNIGHT])
+                | (KING_ATTACKS[index] & pieces[KING])
+                | (bishopAttacks(index, occupied) & (pieces[BISHOP] | queens))
+                | (rookAttacks(index, occupied) & (pieces[ROOK] | queens))) & keep
+
+    def kingIndex(self, color: int) -> int:
+        king = self.pieces[color][KING]
+        return king.bit_length() - 1 if king else None
+
+    def isInCheck(self, color: int) -> int:
+        kingIndex = self.kingIndex(color)
+        if kingIndex is None:
+            return 0
+        return self.attackersTo(kingIndex, 1 - color)
+
+    def getValidMoves(self, index: int, castlingRights: tuple = (False, False), enPassantTarget: int = None) -> int:
+        # returns the bitboard of legal target squares of the piece on 'index'
+        bit = 1 << index
+        color = 0 if self.colors[0] & bit else 1
+        pieceType = self.pieceTypeAt(index, color)
+        if pieceType is None:
+            return 0
+        own = self.colors[color]
+        enemy = self.colors[1 - color]
+        occupied = self.occupied
+        epCaptureBit = 0
+
+        if pieceType == PAWN:
+            empty = FULL ^ occupied
+            if color == PieceColor.WHITE.value:
+                single = (bit << 8) & empty
+                targets = single | (((single & RANK_3) << 8) & empty)
+                epCaptureBit = (1 << (enPassantTarget - 8)) if enPassantTarget is not None else 0
+            else:
+                single = (bit >> 8) & empty
+                targets = single | (((single & RANK_6) >> 8) & empty)
+                epCaptureBit = (1 << (enPassantTarget + 8)) if enPassantTarget is not None else 0
+            attacks = PAWN_ATTACKS[color][index]
+            targets |= attacks & enemy
+            if enPassantTarget is not None and attacks & (1 << enPassantTarget):
+                targets |= 1 << enPassantTarget
+            else:
+                epCaptureBit = 0
+        elif pieceType == KNIGHT:
+            targets = KNIGHT_ATTACKS[index] & ~own
+        elif pieceType == BISHOP:
+            targets = bishopAttacks(index, occupied) & ~own
+        elif pieceType == ROOK:
+            targets = rookAttacks(index, occupied) & ~own
+        elif pieceType == QUEEN:
+            targets = queenAttacks(index, occupied) & ~own
+        else:
+            targets = (KING_ATTACKS[index] & ~own) | self._castlingTargets(index, color, castlingRights)
+
+        kingIndex = self.kingIndex(color)
+        legal = 0
+        for target in iterBits(targets & FULL):
+            targetBit = 1 << target
+            removed = targetBit
+            if epCaptureBit and target == enPassantTarget:
+                removed |= epCaptureBit
+            newOccupied = (occupied & ~bit & ~removed) | targetBit
+            checkedIndex = target if pieceType == KING else kingIndex
+            if checkedIndex is None or not self.attackersTo(checkedIndex, 1 - color, newOccupied, removed):
+                legal |= targetBit
+        return legal
+
+    def _castlingTargets(self, index: int, color: int, castlingRights: tuple) -> int:
+        homeIndex = 4 if color == PieceColor.WHITE.value else 60
+        if index != homeIndex or not (castlingRights[0] or castlingRights[1]):
+            return 0
+        if self.attackersTo(index, 1 - color):
+            return 0
+        targets = 0
+        occupied = self.occupied
+        if castlingRights[0] and not occupied & (0b11 << (index + 1)) \
+                and not self.attackersTo(index + 1, 1 - color) and not self.attackersTo(index + 2, 1 - color):
+            targets |= 1 << (index + 2)
+        if castlingRights[1] and not occupied & (0b111 << (index - 3)) \
+                and not self.attackersTo(index - 1, 1 - color) and not self.attackersTo(index - 2, 1 - color):
+            targets |= 1 << (index - 2)
+        return targets
+
+    def generateLegalMoves(self, color: int, castlingRights: tuple = (False, False), enPassantTarget: int = None) -> List[Move]:
+        # all legal moves of 'color': checkers, check blocking squares and pins are determined once up front
+        us, them = color, 1 - color
+        own = self.colors[us]
+        occupied = self.occupied
+        opponent = self.pieces[them]
+        moves = []
+        kingIndex = self.kingIndex(us)
+        if kingIndex is None:
+            return moves
+
+        # king moves (the king must not shadow a slider attacking one of its target squares):
+        occupiedWithoutKing = occupied & ~(1 << kingIndex)
+        for target in iterBits(KING_ATTACKS[kingIndex] & ~own):
+            if not self.attackersTo(target, them, occupiedWithoutKing):
+                moves.append(Move(LOCATIONS[kingIndex], LOCATIONS[target]))
+        checkers = self.attackersTo(kingIndex, them)
+        if checkers & (checkers - 1):
+            return moves                # double check -> only the king can move
+        if checkers:
+            targetMask = checkers | BETWEEN[kingIndex][checkers.bit_length() - 1]
+        else:
+            targetMask = FULL
+            for target in iterBits(self._castlingTargets(kingIndex, us, castlingRights)):
+                moves.append(Move(LOCATIONS[kingIndex], LOCATIONS[target]))
+
+        # pinned pieces may only move on the line between king and pinning piece:
+        pinned = {}
+        snipers = (rookAttacks(kingIndex, 0) & (opponent[ROOK] | opponent[QUEEN])) \
+            | (bishopAttacks(kingIndex, 0) & (opponent[BISHOP] | opponent[QUEEN]))
+        for sniper in iterBits(snipers):
+            between = BETWEEN[kingIndex][sniper] & occupied
+            if between and not (between & (between - 1)) and (between & own):
+                pinned[between.bit_length() - 1] = LINES[kingIndex][sniper]
+
+        pieces = self.pieces[us]
+        enemy = self.colors[them]
+        empty = FULL ^ occupied
+        for pieceType in [KNIGHT, BISHOP, ROOK, QUEEN]:
+            for index in iterBits(pieces[pieceType]):
+                if pieceType == KNIGHT:
+                    targets = KNIGHT_ATTACKS[index]
+                elif pieceType == BISHOP:
+                    targets = bishopAttacks(index, occupied)
+                elif pieceType == ROOK:
+                    targets = rookAttacks(index, occupied)
+                else:
+                    targets = queenAttacks(index, occupied)
+                targets &= targetMask & ~own
+                if index in pinned:
+                    targets &= pinned[index]
+                fromLocation = LOCATIONS[index]
+                for target in iterBits(targets):
+                    moves.append(Move(fromLocation, LOCATIONS[target]))
+
+        forward = 8 if us == PieceColor.WHITE.value else -8
+        doublePushRank = RANK_3 if us == PieceColor.WHITE.value else RANK_6
+        for index in iterBits(pieces[PAWN]):
+            bit = 1 << index
+            single = ((bit << 8) if forward > 0 else (bit >> 8)) & empty
+            double = (((single & doublePushRank) << 8) if forward > 0 else ((single & doublePushRank) >> 8)) & empty
+            targets = (single | double | (PAWN_ATTACKS[us][index] & enemy)) & targetMask
+            if index in pinned:
+                targets &= pinned[index]
+            fromLocation = LOCATIONS[index]
+            for target in iterBits(targets):
+                if (1 << target) & BACK_RANKS:
+                    for promotion in PROMOTIONS:
+                        moves.append(Move(fromLocation, LOCATIONS[target], promotion))
+                else:
+                    moves.append(Move(fromLocation, LOCATIONS[target]))
+            if enPassantTarget is not None and PAWN_ATTACKS[us][index] & (1 << enPassantTarget):
+                # en passant removes two pieces from a line -> verify the king's safety directly
+                capturedBit = 1 << (enPassantTarget - forward)
+                newOccupied = (occupied & ~bit & ~capturedBit) | (1 << enPassantTarget)
+                if not self.attackersTo(kingIndex, them, newOccupied, capturedBit):
+                    moves.append(Move(fromLocation, LOCATIONS[enPassantTarget]))
+        return moves
+
+    def staticExchange(self, fromIndex: int, toIndex: int) -> int:
+        # material outcome (for the moving side) of the capture sequence started by the move fromIndex -> toIndex,
+        # both sides always recapture with their least valuable piece and may stop when that is better for them;
+        # removing a piece from the occupancy uncovers the sliders behind it (x-rays)
+        fromBit = 1 << fromIndex
+        color = 0 if self.colors[0] & fromBit else 1
+        pieceType = self.pieceTypeAt(fromIndex, color)
+        occupied = self.occupied
+        victim = self.pieceTypeAt(toIndex, 1 - color)
+        if victim is None and pieceType == PAWN and (fromIndex & 7) != (toIndex & 7):
+            victim = PAWN                                                  # en passant
+            occupied &= ~(1 << (toIndex - 8 if color == PieceColor.WHITE.value else toIndex + 8))
+        gains = [EXCHANGE_VALUES[victim] if victim is not None else 0]
+        side = color
+        while True:
+            # 'pieceType' of 'side' moves from 'fromBit' onto the square and may be captured next
+            gains.append(EXCHANGE_VALUES[pieceType] - gains[-1])
+            occupied &= ~fromBit
+            side = 1 - side
+            attackers = self.attackersTo(toIndex, side, occupied) & occupied
+            if not attackers:
+                break
+            for pieceType in range(6):
+                candidates = attackers & self.pieces[side][pieceType]
+                if candidates:
+                    fromBit = candidates & -candidates
+                    break
+        gains.pop()
+        while len(gains) > 1:
+            last = gains.pop()
+            gains[-1] = -max(-gains[-1], last)
+        return gains[0]
+
+    def toLocations(self, bb: int) -> List[Location]:
+        return [LOCATIONS[index] for index in iterBits(bb)]
@@ -1,37 +1,156 @@
-from chupochess.common import Location, SquareColor, File, PieceColor, LocationDictionary, GameState
+from chupochess.common import Location, SquareColor, File, PieceColor, SquareMapView, GameState, BoardBackend, Move, LOCATIONS
 from chupochess.squares import Square
-from typing import List
+from chupochess.bitboards import BitboardPosition, PAWN, PIECE_TYPES, PIECE_NAMES
+from chupochess.attacks import PAWN_ATTACKS
+from chupochess.zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, castlingMask
+from chupochess.evaluation import PIECE_SQUARE_SCORES
+from typing import List, Tuple
 
 class Board:
-    def __init__(self) -> None:
+    def __init__(self, backend: BoardBackend = BoardBackend.OBJECTS, pieces: dict = None) -> None:
+        # pieces: Location -> Piece, defaults to the starting position
         from chupochess.pieces import PieceFactory
+        self.backend = backend
+        self.bitboards = BitboardPosition()
+        self._pieceKey = 0                                          # Zobrist key of pieces and side to move
+        self.evaluationScore = 0                                    # material + piece-square tables, white's point of view
+        self._whiteToMove = True
         self.boardSquares = []
-        self.locationSquareMap = LocationDictionary()
+        self.squares = [None] * 64                                  # mailbox, indexed by Location.index
+        self.locationSquareMap = SquareMapView(self.squares)
         self.whitePieces = []
         self.blackPieces = []
         self.enPassantPossible = []
         self.whiteKingLocation = Location(0, File.E)
         self.blackKingLocation = Location(7, File.E)
         self.whiteToMove = True
-        pieces = PieceFactory.getPieces()
+        self.moveStack = []                                         # undo records of the moves made with push()
+        self._journal = None                                        # primitive board changes of the move in progress
+        self.halfmoveClock = 0                                      # halfmoves since the last capture or pawn move
+        self.fullmoveNumber = 1
+        self.keyHistory = []                                        # Zobrist keys of all positions of the game
+        self.positionCounts = {}                                    # Zobrist key -> number of occurrences
+        if pieces is None: pieces = PieceFactory.getPieces()
         self.gameState = GameState.RUNNING
+        self._legalMoves = None                                     # legal moves of the side to move, see getLegalMoves()
+        self._gameStateValid = False                                # gameState is up to date for the current position
+        self._validMoves = {}                                       # (Zobrist key, square index) -> valid moves, see getValidMoves()
+        self.validMovesHits = 0
+        self.validMovesMisses = 0
+        squareColors = (SquareColor(1), SquareColor(0))
         for file in range(8):
             currentFile = []
             for rank in range(8):
-                currentColor = SquareColor(1) if ((file + rank)%2) == 0 else SquareColor(0)
-                newSquare = Square(currentColor, Location(rank, File(file)))
+                newSquare = Square(squareColors[(file + rank) % 2], LOCATIONS[rank * 8 + file])
                 if newSquare.location in pieces:
                     piece = pieces[newSquare.location]
-                    newSquare.isOccupied = True
-                    newSquare.currentPiece = piece
-                    piece.currentSquare = newSquare  
+                    self._placePiece(piece, newSquare)
+                    if piece.name == "K" and piece.color == PieceColor.WHITE:
+                        self.whiteKingLocation = newSquare.location
+                    elif piece.name == "K":
+                        self.blackKingLocation = newSquare.location
                     if piece.color == PieceColor.BLACK:
                         self.blackPieces.append(piece)
                     else:
                         self.whitePieces.append(piece)
-                self.locationSquareMap[newSquare.location] = newSquare
+                self.squares[newSquare.location.index] = newSquare
                 currentFile.append(newSquare)
             self.boardSquares.append(currentFile)
+        self._recordPosition()
+
+    @staticmethod
+    def fromFEN(fen: str, backend: BoardBackend = BoardBackend.OBJECTS) -> "Board":
+        # builds the position in one pass, e.g. "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        from chupochess.pieces import PieceFactory
+        fields = fen.split()
+        if len(fields) == 4:
+            fields += ["0", "1"]
+        if len(fields) != 6 or len(fields[0].split("/")) != 8 or fields[1] not in ["w", "b"]:
+            raise ValueError("invalid FEN: " + fen)
+        pieces = {}
+        for rowIndex, row in enumerate(fields[0].split("/")):
+            rank = 7 - rowIndex
+            file = 0
+            for char in row:
+                if char.isdigit():
+                    file += int(char)
+                    continue
+                if file > 7 or char.upper() not in "KQRBNP":
+                    raise ValueError("invalid FEN: " + fen)
+                color = PieceColor.WHITE if char.isupper() else PieceColor.BLACK
+                pieces[Location(rank, File(file))] = PieceFactory.getPieceClass(char.upper())(color)
+                file += 1
+            if file != 8:
+                raise ValueError("invalid FEN: " + fen)
+
+        kings = [piece.color for piece in pieces.values() if piece.name == "K"]
+        if sorted(kings, key=lambda color: color.value) != [PieceColor.WHITE, PieceColor.BLACK]:
+            raise ValueError("invalid FEN: " + fen)         # exactly one king per side
+        castling = fields[2]
+        if castling != "-" and any(right not in "KQkq" or castling.count(right) > 1 for right in castling):
+            raise ValueError("invalid FEN: " + fen)
+        enPassant = fields[3]
+        if enPassant != "-" and (len(enPassant) != 2 or enPassant[0] not in "abcdefgh"
+                                 or enPassant[1] != ("6" if fields[1] == "w" else "3")):
+            raise ValueError("invalid FEN: " + fen)
+        if not fields[4].isdigit() or not fields[5].isdigit():
+            raise ValueError("invalid FEN: " + fen)
+
+        # first move flags: pawns on their starting rank, kings and rooks according to the castling rights
+        for location, piece in pieces.items():
+            if piece.name == "P":
+                piece.isFirstMove = location.rank == (1 if piece.color == PieceColor.WHITE else 6)
+            elif piece.name in ["K", "R"]:
+                # castling rights of the piece's color as "K"/"Q" letters
+                rights = "".join(right.upper() for right in castling if right.isupper() == (piece.color == PieceColor.WHITE))
+                homeRank = 0 if piece.color == PieceColor.WHITE else 7
+                if piece.name == "K":
+                    piece.isFirstMove = location == Location(homeRank, File.E) and rights not in ["", "-"]
+                else:
+                    piece.isFirstMove = (location == Location(homeRank, File.H) and "K" in rights) \
+                        or (location == Location(homeRank, File.A) and "Q" in rights)
+
+        board = Board(backend, pieces)
+        board.whiteToMove = fields[1] == "w"
+        if enPassant != "-":
+            # the pawn that just moved two squares (of the side not to move) is located behind the target square
+            target = Location(int(enPassant[1]) - 1, File(ord(enPassant[0]) - ord("a")))
+            pawnRank = target.rank + (1 if target.rank == 2 else -1)
+            pawn = board.getSquare(Location(pawnRank, target.file)).currentPiece
+            movedColor = PieceColor.BLACK if board.whiteToMove else PieceColor.WHITE
+            if pawn is None or pawn.name != "P" or pawn.color != movedColor or board.getSquare(target).isOccupied:
+                raise ValueError("invalid FEN: " + fen)
+            board.enPassantPossible.append(pawn)
+        board.halfmoveClock = int(fields[4])
+        board.fullmoveNumber = int(fields[5])
+        board.keyHistory.clear()
+        board.positionCounts.clear()
+        board._recordPosition()
+        return board
+
+    def toFEN(self) -> str:
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ""
+            empty = 0
+            for file in range(8):
+                piece = self.squares[rank * 8 + file].currentPiece
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty > 0:
+                    row += str(empty)
+                    empty = 0
+                row += piece.name if piece.color == PieceColor.WHITE else piece.name.lower()
+            rows.append(row + (str(empty) if empty > 0 else ""))
+        castling = ""
+        for color in PieceColor:
+            kingside, queenside = self._getCastlingRights(color)
+            rights = ("K" if kingside else "") + ("Q" if queenside else "")
+            castling += rights if color == PieceColor.WHITE else rights.lower()
+        enPassantTarget = self._getEnPassantTarget(PieceColor.WHITE if self.whiteToMove else PieceColor.BLACK)
+        enPassant = str(LOCATIONS[enPassantTarget]).lower() if enPassantTarget is not None else "-"
+        return " ".join(["/".join(rows), "w" if self.whiteToMove else "b", castling or "-", enPassant, str(self.halfmoveClock), str(self.fullmoveNumber)])
 
     def __str__(self) -> str:
         s = ""
@@ -66,17 +185,288 @@ class Board:
             print(sOut + str(rank + 1))
         print("  A B C D E F G H   ")
 
+    @property
+    def whiteToMove(self) -> bool:
+        return self._whiteToMove
+
+    @whiteToMove.setter
+    def whiteToMove(self, value: bool) -> None:
+        if value != self._whiteToMove:
+            self._pieceKey ^= SIDE_KEY
+            self._invalidateCache()
+        self._whiteToMove = value
+
+    @property
+    def zobristKey(self) -> int:
+        # 64-bit position key: pieces and side to move are updated incrementally with every placement/removal,
+        # castling rights and en passant file are derived in O(1) from the corner squares and enPassantPossible
+        key = self._pieceKey ^ CASTLING_KEYS[castlingMask(self._getCastlingRights(PieceColor.WHITE) + self._getCastlingRights(PieceColor.BLACK))]
+        enPassantFile = self._getEnPassantFile()
+        if enPassantFile is not None:
+            key ^= EN_PASSANT_KEYS[enPassantFile]
+        return key
+
+    def getSquare(self, location: Location) -> Square:
+        return self.squares[location.index]
+
+    def _placePiece(self, piece: object, square: Square) -> None:
+        # every piece placement goes through here to keep the bitboards in sync with the squares
+        square.currentPiece = piece
+        square.isOccupied = True
+        piece.currentSquare = square
+        self.bitboards.add(piece.color, piece.name, square.location.index)
+        self._pieceKey ^= PIECE_KEYS[piece.color.value][piece.name][square.location.index]
+        self.evaluationScore += PIECE_SQUARE_SCORES[piece.color.value][piece.name][square.location.index]
+        if self._journal is not None:
+            self._journal.append((Board._PLACE, piece, square))
+
+    def _removePiece(self, square: Square) -> object:
+        piece = square.reset()
+        if piece:
+            self.bitboards.remove(piece.color, piece.name, square.location.index)
+            self._pieceKey ^= PIECE_KEYS[piece.color.value][piece.name][square.location.index]
+            self.evaluationScore -= PIECE_SQUARE_SCORES[piece.color.value][piece.name][square.location.index]
+            if self._journal is not None:
+                self._journal.append((Board._REMOVE, piece, square))
+        return piece
+
+    def _completeMove(self, isCaptureOrPawnMove: bool) -> None:
+        # called once at the end of every move, after the squares and the en passant state are updated
+        self.whiteToMove = not self.whiteToMove
+        self.halfmoveClock = 0 if isCaptureOrPawnMove else self.halfmoveClock + 1
+        if self.whiteToMove:
+            self.fullmoveNumber += 1
+        self._recordPosition()
+        self._invalidateCache()
+
+    def _invalidateCache(self) -> None:
+        # called whenever the position changes: cached legal moves and game state belong to the previous one
+        self._legalMoves = None
+        self._gameStateValid = False
+        self._validMoves.clear()
+
+    def _recordPosition(self) -> None:
+        key = self.zobristKey
+        self.keyHistory.append(key)
+        self.positionCounts[key] = self.positionCounts.get(key, 0) + 1
+
+    def getRepetitionCount(self) -> int:
+        # how often the current position occurred in this game (incl. now)
+        return self.positionCounts.get(self.zobristKey, 0)
+
+    def canClaimDraw(self) -> bool:
+        # threefold repetition or fifty-move rule
+        return self.getRepetitionCount() >= 3 or self.halfmoveClock >= 100
+
+    def claimDraw(self) -> bool:
+        if self.canClaimDraw():
+            self.gameState = GameState.DRAW
+            return True
+        return False
+
+    def _isAutomaticDraw(self, color: PieceColor) -> bool:
+        # fivefold repetition or seventy-five-move rule, unless the last move was checkmate
+        if self.getRepetitionCount() < 5 and self.halfmoveClock < 150:
+            return False
+        return not (len(self.isInCheck(color)) > 0 and len(self.getLegalMoves()) == 0)
+
+    # journal entries: (operation, piece, square or index in the piece list)
+    _PLACE = 0
+    _REMOVE = 1
+    _LIST = 2
+    _UNLIST = 3
+
+    def push(self, move: Move) -> None:
+        # makes the move and records everything needed to take it back with pop()
+        from chupochess.pieces import PieceFactory
+        piece = self.getSquare(move.fromLocation).currentPiece
+        targetSquare = self.getSquare(move.toLocation)
+        touchedPieces = [piece]
+        if piece.name == "K" and abs(move.fromLocation.file.value - move.toLocation.file.value) > 1:
+            # castling -> the rook's first move flag changes, too
+            rookFile = File.H if move.toLocation.file == File.G else File.A
+            touchedPieces.append(self.getSquare(Location(move.fromLocation.rank, rookFile)).currentPiece)
+        firstMoves = [(touched, touched.isFirstMove) for touched in touchedPieces if hasattr(touched, "isFirstMove")]
+        record = (move, [], self.whiteToMove, self.enPassantPossible.copy(), self.whiteKingLocation, self.blackKingLocation, self.gameState, firstMoves, self.halfmoveClock, self.fullmoveNumber)
+        self._journal = record[1]
+        try:
+            if move.promotion:
+                piece.makeMove(targetSquare, self, PieceFactory.getPieceClass(move.promotion))
+            else:
+                piece.makeMove(targetSquare, self)
+        finally:
+            self._journal = None
+        self.moveStack.append(record)
+
+    def pop(self) -> Move:
+        # takes back the last move made with push()
+        move, journal, whiteToMove, enPassantPossible, whiteKingLocation, blackKingLocation, gameState, firstMoves, halfmoveClock, fullmoveNumber = self.moveStack.pop()
+        key = self.keyHistory.pop()
+        if self.positionCounts[key] == 1:
+            del self.positionCounts[key]
+        else:
+            self.positionCounts[key] -= 1
+        for operation, piece, target in reversed(journal):
+            if operation == Board._PLACE:
+                self._removePiece(target)
+            elif operation == Board._REMOVE:
+                self._placePiece(piece, target)
+            elif operation == Board._LIST:
+                self._getPieces(piece.color).pop()
+            else:
+                self._getPieces(piece.color).insert(target, piece)
+        for piece, isFirstMove in firstMoves:
+            piece.isFirstMove = isFirstMove
+        self.whiteToMove = whiteToMove
+        self.enPassantPossible[:] = enPassantPossible
+        self.whiteKingLocation = whiteKingLocation
+        self.blackKingLocation = blackKingLocation
+        self.gameState = gameState
+        self.halfmoveClock = halfmoveClock
+        self.fullmoveNumber = fullmoveNumber
+        self._invalidateCache()
+        return move
+
+    # snapshot piece codes: 0 = empty square, else piece type + 1 | color << 3 | first move flag << 4
+    @staticmethod
+    def _getPieceCode(piece: object) -> int:
+        return (PIECE_TYPES[piece.name] + 1) | (piece.color.value << 3) | (getattr(piece, "isFirstMove", False) << 4)
+
+    def snapshot(self) -> tuple:
+        # compact copy of the position: piece codes of the 64 squares, the order of the piece lists and a few scalars;
+        # the move stack is not part of it, moves made before a restore() can't be taken back afterwards
+        codes = bytearray(64)
+        for square in self.squares:
+            if square.currentPiece is not None:
+                codes[square.location.index] = Board._getPieceCode(square.currentPiece)
+        return (bytes(codes),
+                bytes(piece.currentSquare.location.index for piece in self.whitePieces),
+                bytes(piece.currentSquare.location.index for piece in self.blackPieces),
+                bytes(pawn.currentSquare.location.index for pawn in self.enPassantPossible),
+                self.whiteToMove, self.halfmoveClock, self.fullmoveNumber, self.gameState, tuple(self.keyHistory))
+
+    def restore(self, snapshot: tuple) -> None:
+        # sets the position of a snapshot(), only the squares that differ are touched
+        from chupochess.pieces import PieceFactory
+        codes, whitePieces, blackPieces, enPassant, whiteToMove, halfmoveClock, fullmoveNumber, gameState, keyHistory = snapshot
+        squares = self.squares
+        colors = (PieceColor.WHITE, PieceColor.BLACK)
+        for index in range(64):
+            square = squares[index]
+            piece = square.currentPiece
+            code = codes[index]
+            if piece is not None and code & 15 == Board._getPieceCode(piece) & 15:
+                if hasattr(piece, "isFirstMove"):
+                    piece.isFirstMove = bool(code & 16)
+                continue
+            if piece is not None:
+                self._removePiece(square)
+            if code:
+                piece = PieceFactory.getPieceClass(PIECE_NAMES[(code & 7) - 1])(colors[(code >> 3) & 1])
+                if hasattr(piece, "isFirstMove"):
+                    piece.isFirstMove = bool(code & 16)
+                self._placePiece(piece, square)
+                if piece.name == "K":
+                    if piece.color == PieceColor.WHITE:
+                        self.whiteKingLocation = square.location
+                    else:
+                        self.blackKingLocation = square.location
+        self.whitePieces[:] = [squares[index].currentPiece for index in whitePieces]
+        self.blackPieces[:] = [squares[index].currentPiece for index in blackPieces]
+        self.enPassantPossible[:] = [squares[index].currentPiece for index in enPassant]
+        self.whiteToMove = whiteToMove
+        self.halfmoveClock = halfmoveClock
+        self.fullmoveNumber = fullmoveNumber
+        self.gameState = gameState
+        self.moveStack.clear()
+        self.keyHistory[:] = keyHistory
+        self.positionCounts.clear()
+        for key in keyHistory:
+            self.positionCounts[key] = self.positionCounts.get(key, 0) + 1
+        self._invalidateCache()
+
+    def clone(self) -> "Board":
+        # independent copy of the position (without the move stack, see snapshot())
+        board = Board(self.backend, {})
+        board.restore(self.snapshot())
+        return board
+
+    def getValidMoves(self, location: Location) -> List[Location]:
+        # cached per position and square until the next move (don't modify the returned list)
+        key = (self.zobristKey, location.index)
+        moves = self._validMoves.get(key)
+        if moves is not None:
+            self.validMovesHits += 1
+            return moves
+        self.validMovesMisses += 1
+        moves = self._generateValidMoves(location)
+        self._validMoves[key] = moves
+        return moves
+
+    def _generateValidMoves(self, location: Location) -> List[Location]:
+        square = self.getSquare(location)
+        if not square.isOccupied:
+            return []
+        if self.backend == BoardBackend.BITBOARD:
+            color = square.currentPiece.color
+            moves = self.bitboards.getValidMoves(location.index, self._getCastlingRights(color), self._getEnPassantTarget(color))
+            return self.bitboards.toLocations(moves)
+        return square.currentPiece.getValidMoves(self)
+
+    def isInCheck(self, color: PieceColor) -> List[Location]:    # returns locations of immediate attackers
+        if self.backend == BoardBackend.BITBOARD:
+            return self.bitboards.toLocations(self.bitboards.isInCheck(color.value))
+        return self.getSquare(self.getKingLocation(color)).currentPiece.isInCheck(self)
+
+    def generateLegalMoves(self, color: PieceColor) -> List[Move]:
+        return self.bitboards.generateLegalMoves(color.value, self._getCastlingRights(color), self._getEnPassantTarget(color))
+
+    def getLegalMoves(self) -> List[Move]:
+        # legal moves of the side to move, generated once per position (don't modify the returned list)
+        if self._legalMoves is None:
+            self._legalMoves = self.generateLegalMoves(PieceColor.WHITE if self.whiteToMove else PieceColor.BLACK)
+        return self._legalMoves
+
+    def _getCastlingRights(self, color: PieceColor) -> Tuple[bool, bool]:   # (kingside, queenside)
+        rank = 0 if color == PieceColor.WHITE else 7
+        king = self.squares[rank * 8 + File.E.value].currentPiece
+        if not king or king.name != "K" or king.color != color or not king.isFirstMove:
+            return (False, False)
+        rights = []
+        for file in [File.H, File.A]:
+            rook = self.squares[rank * 8 + file.value].currentPiece
+            rights.append(bool(rook) and rook.name == "R" and rook.color == color and rook.isFirstMove)
+        return tuple(rights)
+
+    def _getEnPassantTarget(self, color: PieceColor) -> int:
+        # index of the square a pawn of 'color' could capture en passant on (or None)
+        for pawn in self.enPassantPossible:
+            if pawn.color != color:
+                index = pawn.currentSquare.location.index
+                return index - 8 if pawn.color == PieceColor.WHITE else index + 8
+        return None
+
+    def _getEnPassantFile(self) -> int:
+        # file of the en passant target square, only if the side to move has a pawn to capture there
+        color = PieceColor.WHITE if self.whiteToMove else PieceColor.BLACK
+        target = self._getEnPassantTarget(color)
+        if target is None or not (PAWN_ATTACKS[color.Not().value][target] & self.bitboards.pieces[color.value][PAWN]):
+            return None
+        return target & 7
+
     def getPieceList(self, color: PieceColor) -> List[object]:
         if color == PieceColor.BLACK:
             return self.blackPieces.copy()
         else:
             return self.whitePieces.copy()
     
+    def _getPieces(self, color: PieceColor) -> List[object]:
+        return self.blackPieces if color == PieceColor.BLACK else self.whitePieces
+
     def appendPieceList(self, piece: object):
-        if piece.color == PieceColor.WHITE:
-            self.whitePieces.append(piece)
-        else:
-            self.blackPieces.append(piece)
+        self._getPieces(piece.color).append(piece)
+        if self._journal is not None:
+            self._journal.append((Board._LIST, piece, None))
 
     def getKingLocation(self, color: PieceColor) -> Location:
         if color == PieceColor.BLACK:
@@ -86,10 +476,11 @@ class Board:
 
     def updatePieceList(self, piece: object) -> None:
         if not piece: return
-        if piece.color == PieceColor.BLACK:
-            self.blackPieces.remove(piece)
-        elif piece.color == PieceColor.WHITE:
-            self.whitePieces.remove(piece)
+        pieces = self._getPieces(piece.color)
+        index = pieces.index(piece)
+        del pieces[index]
+        if self._journal is not None:
+            self._journal.append((Board._UNLIST, piece, index))
 
     def getSetup(self) -> dict:
         # only temporary, for HTML online GUI:
@@ -101,10 +492,19 @@ class Board:
         return setup
 
     def updateGameState(self) -> None:
-        # TODO: performance point of view: probably it's best to first check if the king has any valid moves
+        # evaluated once per position, further calls return immediately until the next move
+        if self._gameStateValid:
+            return
+        self._gameStateValid = True
         color = PieceColor.WHITE if self.whiteToMove else PieceColor.BLACK
-        king = self.locationSquareMap[self.getKingLocation(color)].currentPiece
-        kingMoves = king.getValidMoves(self)
+        if self._isAutomaticDraw(color):
+            self.gameState = GameState.DRAW
+            return
+        if self.backend == BoardBackend.BITBOARD:
+            self._updateGameStateBitboard(color)
+            return
+        king = self.getSquare(self.getKingLocation(color)).currentPiece
+        kingMoves = self.getValidMoves(king.currentSquare.location)
 
         if self._isInsufficientMaterial(): 
             self.gameState = GameState.DRAW
@@ -116,15 +516,22 @@ class Board:
             # two relevant cases: 
             # a) one attacking piece, (no king moves), no other piece to block the attack -> checkmate
             # b) stalemate: not in check but no legal moves -> draw
-            for piece in self.getPieceList(color):
-                if len(piece.getValidMoves(self)) > 0: 
-                    return                                          # for performance reasons 
+            if len(self.getLegalMoves()) > 0:
+                return                                              # checks and pins are determined once for all pieces
             if len(king.isInCheck(self)) > 0:
                 self.gameState = GameState(color.Not().value + 2)   # checkmate - opponent team wins
             else:
                 self.gameState = GameState.DRAW                     # stalemate: not in check but no legal moves
 
-        # TODO: missing for draw: threefold/fivefold repetition and fifty-move rule / seventy-five-move rule
+    def _updateGameStateBitboard(self, color: PieceColor) -> None:
+        if self._isInsufficientMaterial():
+            self.gameState = GameState.DRAW
+        elif len(self.getLegalMoves()) > 0:
+            return
+        elif self.bitboards.isInCheck(color.value):
+            self.gameState = GameState(color.Not().value + 2)       # checkmate - opponent team wins
+        else:
+            self.gameState = GameState.DRAW                         # stalemate
 
     def _isInsufficientMaterial(self) -> bool:
         if len(self.whitePieces) > 2 or len(self.blackPieces) > 2:
@@ -8,6 +8,10 @@ class GameState(Enum):
     WHITE_WINS = 2
     BLACK_WINS = 3
 
+class BoardBackend(Enum):
+    OBJECTS = 0         # move generation walks Square/Piece objects
+    BITBOARD = 1        # move generation answers from bitboards (see chupochess.bitboards)
+
 class PieceColor(Enum):
     WHITE = 0
     BLACK = 1
@@ -32,19 +36,36 @@ class File(Enum):
     H = 7
 
 class Location:
-    def __init__(self, rank: int, file: File) -> None:
-        self.rank = rank
-        self.file = file
+    # immutable; the 64 board locations are interned (see LOCATIONS), so Location(rank, file) doesn't allocate
+    __slots__ = ("rank", "file", "index")
+
+    def __new__(cls, rank: int, file: File) -> Self:
+        if LOCATIONS and 0 <= rank < 8:
+            return LOCATIONS[rank * 8 + file.value]
+        location = object.__new__(cls)
+        object.__setattr__(location, "rank", rank)
+        object.__setattr__(location, "file", file)
+        # square index in the board's mailbox: A1 = 0, B1 = 1, ..., H8 = 63
+        object.__setattr__(location, "index", rank * 8 + file.value)
+        return location
+
+    def __setattr__(self, __name: str, __value: object) -> None:
+        raise AttributeError("Location is immutable")
 
-    def __key(self):
-        return (self.rank, self.file)
+    def __delattr__(self, __name: str) -> None:
+        raise AttributeError("Location is immutable")
+
+    def __reduce__(self):
+        return (Location, (self.rank, self.file))
 
     def __hash__(self) -> int:
-        return hash(self.__key)
+        return self.index
         
     def __eq__(self, __o: object) -> bool:
-        if isinstance(__o, Location):
-            return self.__key() == __o.__key()
+        if self is __o:
+            return True
+        elif isinstance(__o, Location):
+            return self.rank == __o.rank and self.file == __o.file
         else:
             return NotImplemented
 
@@ -53,31 +74,85 @@ class Location:
 
     def offset(self, target: Self) -> Tuple[int,int]:   # return: (fileOffset, rankOffset)
         return (target.file.value - self.file.value, target.rank - self.rank)
+
+LOCATIONS = []
+LOCATIONS.extend([Location(index >> 3, File(index & 7)) for index in range(64)])       # indexed by Location.index
         
 
+class Move:
+    __slots__ = ("fromLocation", "toLocation", "promotion")
+
+    def __init__(self, fromLocation: Location, toLocation: Location, promotion: str = None) -> None:
+        self.fromLocation = fromLocation
+        self.toLocation = toLocation
+        self.promotion = promotion          # piece name ("Q", "R", "B", "N") for promotion moves
+
+    def __hash__(self) -> int:
+        return hash((self.fromLocation.index, self.toLocation.index, self.promotion))
+
+    def __eq__(self, __o: object) -> bool:
+        if isinstance(__o, Move):
+            return self.fromLocation == __o.fromLocation and self.toLocation == __o.toLocation and self.promotion == __o.promotion
+        else:
+            return NotImplemented
+
+    def __str__(self) -> str:
+        return str(self.fromLocation) + str(self.toLocation) + (self.promotion if self.promotion else "")
+
+    def __repr__(self) -> str:
+        return "Move(" + str(self) + ")"
+
+    @staticmethod
+    def fromString(move: str) -> Self:
+        # input format: "E2E4" (case insensitive), promotions with the piece name appended: "A7A8Q"
+        move = move.strip().upper()
+        return Move(Location(int(move[1]) - 1, File[move[0]]), Location(int(move[3]) - 1, File[move[2]]), move[4:] or None)
+
 class LocationFactory:
     def __init__(self) -> None:
         pass
     def build(location: Location, fileOffset: int, rankOffset: int) -> Location:
-        try:
-            newLocation = Location(location.rank + rankOffset, File(location.file.value + fileOffset))
-            return newLocation
-        except:
-            return None
+        # returns the interned location or None if the target is not on the board
+        file = location.file.value + fileOffset
+        rank = location.rank + rankOffset
+        if 0 <= file < 8 and 0 <= rank < 8:
+            return LOCATIONS[rank * 8 + file]
+        return None
 
 class LocationDictionary(dict):
-    def __contains__(self, __o: Location) -> bool:
-        # must be overwritten to make 'in' operator work for Location comparison
-        for key in self.keys():
-            if key == __o: 
-                return True
-        return False
+    # Location is hashable, so lookups are plain dict lookups now
+    def __missing__(self, __k: Location) -> object:
+        # keep the old behaviour of returning None for unknown locations
+        return None
+
+class SquareMapView:
+    # dict-like view on the board's mailbox (see Board.squares), keeps 'board.locationSquareMap[location]'
+    # and 'location in board.locationSquareMap' working with constant time lookups
+    def __init__(self, squares: list) -> None:
+        self._squares = squares
+
+    def __contains__(self, __o: object) -> bool:
+        return isinstance(__o, Location) and (0 <= __o.rank < 8) and (self._squares[__o.index] is not None)
 
     def __getitem__(self, __k: Location) -> object:
-        # must be overwritten to make getting an item via dict[key] possible
-        for key in self.keys():
-            if key == __k:
-                return super().__getitem__(key)
+        if __k in self:
+            return self._squares[__k.index]
+        return None
+
+    def __setitem__(self, __k: Location, __v: object) -> None:
+        self._squares[__k.index] = __v
+
+    def __len__(self) -> int:
+        return sum(1 for square in self._squares if square is not None)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self) -> list:
+        return [square.location for square in self._squares if square is not None]
 
-    
+    def values(self) -> list:
+        return [square for square in self._squares if square is not None]
 
+    def items(self) -> list:
+        return [(square.location, square) for square in self._squares if square is not None]
@@ -0,0 +1,85 @@
+from chupochess.common import PieceColor
+
+# static evaluation: material plus piece-square tables, in centipawns from white's point of view;
+# Board keeps the sum up to date with every piece placement/removal (see Board.evaluationScore)
+
+PIECE_VALUES = {"P": 100, "N": 320, "B": 330, "R": 500, "Q": 900, "K": 0}
+
+# piece-square tables from white's point of view, written as seen from white's side: first row = rank 8
+_PIECE_SQUARE_TABLES = {
+    "P": [  0,  0,  0,  0,  0,  0,  0,  0,
+           50, 50, 50, 50, 50, 50, 50, 50,
+           10, 10, 20, 30, 30, 20, 10, 10,
+            5,  5, 10, 25, 25, 10,  5,  5,
+            0,  0,  0, 20, 20,  0,  0,  0,
+            5, -5,-10,  0,  0,-10, -5,  5,
+            5, 10, 10,-20,-20, 10, 10,  5,
+            0,  0,  0,  0,  0,  0,  0,  0],
+    "N": [-50,-40,-30,-30,-30,-30,-40,-50,
+          -40,-20,  0,  0,  0,  0,-20,-40,
+          -30,  0, 10, 15, 15, 10,  0,-30,
+          -30,  5, 15, 20, 20, 15,  5,-30,
+          -30,  0, 15, 20, 20, 15,  0,-30,
+          -30,  5, 10, 15, 15, 10,  5,-30,
+          -40,-20,  0,  5,  5,  0,-20,-40,
+          -50,-40,-30,-30,-30,-30,-40,-50],
+    "B": [-20,-10,-10,-10,-10,-10,-10,-20,
+          -10,  0,  0,  0,  0,  0,  0,-10,
+          -10,  0,  5, 10, 10,  5,  0,-10,
+          -10,  5,  5, 10, 10,  5,  5,-10,
+          -10,  0, 10, 10, 10, 10,  0,-10,
+          -10, 10, 10, 10, 10, 10, 10,-10,
+          -10,  5,  0,  0,  0,  0,  5,-10,
+          -20,-10,-10,-10,-10,-10,-10,-20],
+    "R": [  0,  0,  0,  0,  0,  0,  0,  0,
+            5, 10, 10, 10, 10, 10, 10,  5,
+           -5,  0,  0,  0,  0,  0,  0, -5,
+           -5,  0,  0,  0,  0,  0,  0, -5,
+           -5,  0,  0,  0,  0,  0,  0, -5,
+           -5,  0,  0,  0,  0,  0,  0, -5,
+           -5,  0,  0,  0,  0,  0,  0, -5,
+            0,  0,  0,  5,  5,  0,  0,  0],
+    "Q": [-20,-10,-10, -5, -5,-10,-10,-20,
+          -10,  0,  0,  0,  0,  0,  0,-10,
+          -10,  0,  5,  5,  5,  5,  0,-10,
+           -5,  0,  5,  5,  5,  5,  0, -5,
+            0,  0,  5,  5,  5,  5,  0, -5,
+          -10,  5,  5,  5,  5,  5,  0,-10,
+          -10,  0,  5,  0,  0,  0,  0,-10,
+          -20,-10,-10, -5, -5,-10,-10,-20],
+    "K": [-30,-40,-40,-50,-50,-40,-40,-30,
+          -30,-40,-40,-50,-50,-40,-40,-30,
+          -30,-40,-40,-50,-50,-40,-40,-30,
+          -30,-40,-40,-50,-50,-40,-40,-30,
+          -20,-30,-30,-40,-40,-30,-30,-20,
+          -10,-20,-20,-20,-20,-20,-20,-10,
+           20, 20,  0,  0,  0,  0, 20, 20,
+           20, 30, 10,  0,  0, 10, 30, 20],
+}
+
+def _buildScores(color: PieceColor) -> dict:
+    # PIECE_SQUARE_SCORES[color.value][name][square index]: signed contribution of a piece on that square
+    scores = {}
+    for name, table in _PIECE_SQUARE_TABLES.items():
+        values = []
+        for index in range(64):
+            rank, file = index >> 3, index & 7
+            row = 7 - rank if color == PieceColor.WHITE else rank     # black: mirrored vertically
+            value = PIECE_VALUES[name] + table[row * 8 + file]
+            values.append(value if color == PieceColor.WHITE else -value)
+        scores[name] = values
+    return scores
+
+PIECE_SQUARE_SCORES = [_buildScores(color) for color in PieceColor]
+
+def computeEvaluation(board: object) -> int:
+    # full recomputation from the squares, Board maintains the same score incrementally
+    score = 0
+    for square in board.squares:
+        if square.isOccupied:
+            score += PIECE_SQUARE_SCORES[square.currentPiece.color.value][square.currentPiece.name][square.location.index]
+    return score
+
+def evaluate(board: object) -> int:
+    # O(1): the incrementally updated score, from the point of view of the side to move
+    return board.evaluationScore if board.whiteToMove else -board.evaluationScore
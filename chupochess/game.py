@@ -1,6 +1,6 @@
 from typing import List, Tuple
 from chupochess.board import Board
-from chupochess.common import File, Location, PieceColor, GameState
+from chupochess.common import File, Location, PieceColor, GameState, LOCATIONS
 
 import pygame as p
 import sys
@@ -34,7 +34,7 @@ class Game:
                 selectedRank = int(move[2]) - 1
                 selectedSquare = board.locationSquareMap[Location(file=File(selectedFile), rank=selectedRank)]
                 # get valid moves
-                validMoves = selectedSquare.currentPiece.getValidMoves(board)
+                validMoves = board.getValidMoves(selectedSquare.location)
 
             else:   # make move
                 fromTo = move.split("->")
@@ -50,8 +50,10 @@ class Game:
                 
                 validMoves = None
 
-    def main(self) -> None:
+    def main(self, eventDriven: bool = True) -> None:
         # pygame with chess inspiration: https://github.com/mikolaj-skrzypczak/chess-engine/blob/master/chess/ChessMain.py
+        # eventDriven: sleep until input arrives and repaint only the squares that changed,
+        # otherwise everything is redrawn MAX_FPS times per second
         p.init()
         board = Board()
         screen = p.display.set_mode((self.WIDTH, self.HEIGHT))
@@ -59,28 +61,38 @@ class Game:
         screen.fill(p.Color("white"))
 
         self._loadImages()
+        self._prerender()
 
         squareSelected = None
         highlightedSquares = []         # contains Tuples (Position, p.Color)
+        dirtySquares = set()            # positions to repaint in event driven mode
+        screen.blit(self.boardSurface, (0, 0))
+        self._drawPieces(screen, board)
+        p.display.flip()
 
         while True:
 
-            self._drawBoard(screen)
-            self._drawPieces(screen, board)
-            self._highlightSquares(screen, highlightedSquares)
+            if not eventDriven:
+                screen.blit(self.boardSurface, (0, 0))
+                self._drawPieces(screen, board)
+                self._highlightSquares(screen, highlightedSquares)
 
-            for e in p.event.get():
+            events = [p.event.wait()] + p.event.get() if eventDriven else p.event.get()
+            for e in events:
                 if e.type == p.QUIT:
                     p.quit()
                     sys.exit()
+                elif e.type == p.VIDEOEXPOSE:
+                    dirtySquares.update((col, row) for col in range(self.DIMENSION) for row in range(self.DIMENSION))
                 elif e.type == p.MOUSEBUTTONDOWN:
+                    dirtySquares.update(highlightedSquares)         # old highlights are removed or replaced
                     mousePos = tuple(int(pos / self.SQ_SIZE) for pos in p.mouse.get_pos())
                     location = self._getLocation(mousePos)
                     if (squareSelected == None) and (location in board.locationSquareMap) and (board.locationSquareMap[location].isOccupied == True):
                         piece = board.locationSquareMap[location].currentPiece
                         if self._myTurn(board, piece.color):
                             squareSelected = mousePos
-                            for move in piece.getValidMoves(board):
+                            for move in board.getValidMoves(location):
                                 highlightedSquares.append(self._getPosition(move))
                         else: 
                             squareSelected = None
@@ -88,14 +100,29 @@ class Game:
                     elif (squareSelected != None) and (location in board.locationSquareMap) and (mousePos in highlightedSquares):
                         # make move
                         fromSquare = board.locationSquareMap[self._getLocation(squareSelected)]
+                        before = [square.currentPiece for square in board.squares]
                         fromSquare.currentPiece.makeMove(board.locationSquareMap[self._getLocation(mousePos)], board)
+                        board.updateGameState()             # only changes with a move, cached on the board
+                        # incl. the rook when castling, the pawn captured en passant and promotions:
+                        dirtySquares.update(self._getPosition(LOCATIONS[index]) for index in range(64) if board.squares[index].currentPiece is not before[index])
                         squareSelected = None
                         highlightedSquares.clear()
                     else:
                         squareSelected = None
                         highlightedSquares.clear()
-            board.updateGameState()
-            
+                    dirtySquares.update(highlightedSquares)
+
+            if eventDriven:
+                if dirtySquares:
+                    rects = [self._drawSquare(screen, board, square, square in highlightedSquares) for square in dirtySquares]
+                    dirtySquares.clear()
+                    if board.gameState != GameState.RUNNING:
+                        self._drawGameOver(screen, board.gameState)
+                        p.display.flip()
+                    else:
+                        p.display.update(rects)
+                continue
+
             if board.gameState != GameState.RUNNING:
                 self._drawGameOver(screen, board.gameState)
 
@@ -136,14 +163,30 @@ class Game:
                 color = colors[((row + col ) % 2)]
                 p.draw.rect(screen, color, p.Rect(col * self.SQ_SIZE, row * self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE))
     
+    def _prerender(self) -> None:
+        # rendered once: the empty board and the highlight overlay, frames are composed by blitting them
+        self.boardSurface = p.Surface((self.WIDTH, self.HEIGHT))
+        self._drawBoard(self.boardSurface)
+        self.highlightSurface = p.Surface((self.SQ_SIZE, self.SQ_SIZE))
+        self.highlightSurface.set_alpha(100)
+        self.highlightSurface.fill(p.Color(255,0,0))
+
     def _highlightSquares(self, screen: p.Surface, squares: List[Tuple[int,int]]) -> None:
-        # input: List[Tuple[Tuple[int,int], p.Color]]
-        COLOR = p.Color(255,0,0) 
+        # input: List[Tuple[int,int]]
         for square in squares:
-            surface = p.Surface((self.SQ_SIZE, self.SQ_SIZE))
-            surface.set_alpha(100)
-            surface.fill(COLOR)
-            screen.blit(surface, (square[0] * self.SQ_SIZE, square[1] * self.SQ_SIZE))
+            screen.blit(self.highlightSurface, (square[0] * self.SQ_SIZE, square[1] * self.SQ_SIZE))
+
+    def _drawSquare(self, screen: p.Surface, board: Board, position: Tuple[int,int], highlighted: bool) -> p.Rect:
+        # repaints a single square (background, piece, highlight) and returns the area to update on the display
+        rect = p.Rect(position[0] * self.SQ_SIZE, position[1] * self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE)
+        screen.blit(self.boardSurface, rect, rect)
+        square = board.getSquare(self._getLocation(position))
+        if square.isOccupied:
+            name = ("w" if square.currentPiece.color == PieceColor.WHITE else "b") + square.currentPiece.name
+            screen.blit(self.IMAGES[name], p.Rect((position[0]+0.1)*self.SQ_SIZE, (position[1]+0.1) * self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE))
+        if highlighted:
+            screen.blit(self.highlightSurface, rect)
+        return rect
 
     def _myTurn(self, board: Board, color: PieceColor) -> bool:
         return (((board.whiteToMove == True) and (color == PieceColor.WHITE)) or ((board.whiteToMove == False) and (color == PieceColor.BLACK)))
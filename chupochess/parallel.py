@@ -0,0 +1,129 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List
+from chupochess.board import Board
+from chupochess.common import Move
+from chupochess.search import Search, SearchResult
+from chupochess.transposition import TranspositionTable, getTableBytes
+from chupochess.tablebase import Tablebase
+
+# Lazy SMP: several worker processes search the same root position and only share the transposition table,
+# which lives in shared memory; the workers diversify by starting their iterative deepening at different depths
+# the workers are spawned, not forked: forking a process that runs other threads (e.g. the UCI input loop) can deadlock
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+def _searchWorker(workerIndex: int, fen: str, keyHistory: List[int], memoryName: str, sizeMB: float, age: int,
+                  limits: tuple, stopEvent: object, results: object, tablebaseDirectory: str = None) -> None:
+    # runs in its own process: rebuilds the position (incl. the game history for repetitions) and searches it
+    memory = shared_memory.SharedMemory(name=memoryName)
+    tablebase = Tablebase(tablebaseDirectory) if tablebaseDirectory else None
+    table = None
+    try:
+        board = Board.fromFEN(fen)
+        board.keyHistory[:] = keyHistory
+        board.positionCounts.clear()
+        for key in keyHistory:
+            board.positionCounts[key] = board.positionCounts.get(key, 0) + 1
+        table = TranspositionTable(sizeMB, memory.buf)
+        table.age = (age - 1) & 63                      # Search.search() advances it to the parent's age
+        search = Search(board, table, stopEvent, tablebase)
+
+        def report(result: SearchResult) -> None:
+            if workerIndex == 0:
+                results.put(("info", workerIndex, result.depth, result.score, [str(move) for move in result.pv], result.nodes))
+        depth, nodes, movetime = limits
+        result = search.search(depth, nodes, movetime, report, startDepth=1 + workerIndex % 2)
+        results.put(("done", workerIndex, result.depth, result.score, [str(move) for move in result.pv], result.nodes,
+                     str(result.bestMove) if result.bestMove else None))
+    finally:
+        if table is not None:
+            table.release()             # also if the search failed and its frames still refer to the table
+        if tablebase:
+            tablebase.close()
+        memory.close()
+
+class ParallelSearch:
+    def __init__(self, board: Board, processes: int = None, sizeMB: float = 16, tablebase: Tablebase = None) -> None:
+        # the table (and tablebase) are kept between searches, set 'board' to search another position
+        self.board = board
+        self.tablebase = tablebase
+        self.processes = processes or multiprocessing.cpu_count()
+        self.sizeMB = sizeMB
+        self._memory = shared_memory.SharedMemory(create=True, size=getTableBytes(sizeMB))
+        self.table = TranspositionTable(sizeMB, self._memory.buf)
+        self._stopEvent = _CONTEXT.Event()
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+
+    def close(self) -> None:
+        # releases the shared memory, the table is no longer usable afterwards
+        if self._memory is not None:
+            self.table.release()
+            self.table = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __enter__(self) -> "ParallelSearch":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def search(self, depth: int = None, nodes: int = None, movetime: float = None,
+               callback: Callable[[SearchResult], None] = None) -> SearchResult:
+        # same limits as Search.search ('nodes' is split between the workers), 'callback' receives the iterations
+        # of the main worker; the result is the one of the deepest completed iteration over all workers
+        start = time.perf_counter()
+        self._stopEvent.clear()     # a stop() meant for an earlier search must not end this one
+        self.table.newSearch()
+        results = _CONTEXT.Queue()
+        limits = (depth, nodes // self.processes if nodes is not None else None, movetime)
+        workers = [_CONTEXT.Process(target=_searchWorker, daemon=True,
+                                           args=(index, self.board.toFEN(), self.board.keyHistory, self._memory.name,
+                                                 self.sizeMB, self.table.age, limits, self._stopEvent, results,
+                                                 self.tablebase.directory if self.tablebase else None))
+                   for index in range(self.processes)]
+        for worker in workers:
+            worker.start()
+
+        best = None
+        totalNodes = 0
+        finished = 0
+        while finished < len(workers):
+            try:
+                message = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    break           # a worker died without reporting
+                continue
+            result = SearchResult()
+            result.depth, result.score = message[2], message[3]
+            result.pv = [Move.fromString(move) for move in message[4]]
+            if message[0] == "info":
+                result.nodes = message[5]
+                result.time = time.perf_counter() - start
+                if result.pv:
+                    result.bestMove = result.pv[0]
+                if callback:
+                    callback(result)
+                continue
+            finished += 1
+            totalNodes += message[5]
+            result.bestMove = Move.fromString(message[6]) if message[6] else None
+            if message[1] == 0:
+                self._stopEvent.set()               # the main worker is done -> stop the helpers
+            if best is None or result.depth > best.depth or (result.depth == best.depth and message[1] == 0):
+                best = result
+        for worker in workers:
+            worker.join()
+        if best is None:
+            best = SearchResult()
+        best.nodes = totalNodes
+        best.time = time.perf_counter() - start
+        self._stopEvent.clear()
+        return best
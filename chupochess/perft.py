@@ -0,0 +1,80 @@
+import argparse
+import time
+from typing import Dict, List
+from chupochess.board import Board
+from chupochess.common import PieceColor
+
+# test positions as FEN and their known leaf node counts per depth
+POSITIONS = {
+    "start": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281, 4865609]),
+    "castling": ("r3k2r/pppq1ppp/2npbn2/2b1p3/2B1P3/2NPBN2/PPPQ1PPP/R3K2R w KQkq - 6 8", [43, 1840, 78300]),
+    "enPassant": ("rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3", [31, 781, 24166]),
+    "promotion": ("r2qkbnr/1Ppppppp/2n5/8/8/8/1PPPPPPP/RNBQKBNR w KQkq - 1 5", [33, 890, 28808]),
+    "pins": ("rnb1k1nr/pppp1ppp/8/4p3/1b1PP2q/2N5/PPP2PPP/R1BQKBNR w KQkq - 3 4", [30, 1265, 38893]),
+    # the standard perft positions from the Chess Programming Wiki
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+}
+
+def perft(board: Board, depth: int) -> int:
+    # number of leaf nodes of the legal move tree of the given depth
+    if depth == 0:
+        return 1
+    moves = board.generateLegalMoves(PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def divide(board: Board, depth: int) -> Dict[str, int]:
+    # leaf node counts per root move
+    counts = {}
+    for move in board.generateLegalMoves(PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK):
+        board.push(move)
+        counts[str(move)] = perft(board, depth - 1) if depth > 1 else 1
+        board.pop()
+    return counts
+
+def getPosition(name: str) -> Board:
+    return Board.fromFEN(POSITIONS[name][0])
+
+def main(args: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="perft: count leaf nodes of the legal move tree")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--position", choices=list(POSITIONS.keys()) + ["all"], default="all")
+    parser.add_argument("--divide", action="store_true", help="print node counts per root move")
+    options = parser.parse_args(args)
+
+    names = list(POSITIONS.keys()) if options.position == "all" else [options.position]
+    allPassed = True
+    for name in names:
+        board = getPosition(name)
+        start = time.perf_counter()
+        if options.divide:
+            counts = divide(board, options.depth)
+            for move in sorted(counts):
+                print(move + ": " + str(counts[move]))
+            nodes = sum(counts.values())
+        else:
+            nodes = perft(board, options.depth)
+        duration = time.perf_counter() - start
+        expected = POSITIONS[name][1]
+        if options.depth <= len(expected):
+            passed = nodes == expected[options.depth - 1]
+            allPassed = allPassed and passed
+            result = "ok" if passed else "FAILED (expected " + str(expected[options.depth - 1]) + ")"
+        else:
+            result = "no reference"
+        nps = int(nodes / duration) if duration > 0 else 0
+        print(name + " depth " + str(options.depth) + ": " + str(nodes) + " nodes in " + "%.2f" % duration + "s (" + str(nps) + " nodes/s) " + result)
+    if not allPassed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import re
+from typing import Dict, Iterator, List, TextIO
+from chupochess.board import Board
+from chupochess.common import Location, File, Move, PieceColor, BoardBackend
+
+# streaming PGN support: games are read line by line from a file handle, so archives of any size
+# are processed with constant memory
+
+STANDARD_POSITION = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+SEVEN_TAG_ROSTER = ["Event", "Site", "Date", "Round", "White", "Black", "Result"]
+RESULTS = ["1-0", "0-1", "1/2-1/2", "*"]
+
+HEADER_REGEX = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+TOKEN_REGEX = re.compile(r'\{|\}|\(|\)|;|\$\d+|1-0|0-1|1/2-1/2|\*|[^\s{}();]+')
+MOVE_NUMBER_REGEX = re.compile(r'^\d+\.*')
+SAN_REGEX = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+
+class PGNGame:
+    def __init__(self, headers: Dict[str, str] = None, moves: List[str] = None) -> None:
+        self.headers = headers if headers is not None else {}
+        self.moves = moves if moves is not None else []         # moves in SAN, e.g. ["e4", "e5", "Nf3"]
+
+    @property
+    def result(self) -> str:
+        return self.headers.get("Result", "*")
+
+    def getBoard(self, backend: BoardBackend = BoardBackend.OBJECTS) -> Board:
+        # starting position of the game (see the "FEN" header)
+        return Board.fromFEN(self.headers.get("FEN", STANDARD_POSITION), backend)
+
+    def replay(self, backend: BoardBackend = BoardBackend.OBJECTS) -> Board:
+        # plays all moves onto a new board, raises ValueError on illegal or ambiguous moves
+        board = self.getBoard(backend)
+        for san in self.moves:
+            board.push(parseSAN(board, san))
+        return board
+
+    @staticmethod
+    def fromBoard(board: Board, headers: Dict[str, str] = None) -> "PGNGame":
+        # converts the moves made with Board.push() into SAN, leaves the board as it was
+        moves = []
+        while board.moveStack:
+            moves.append(board.pop())
+        game = PGNGame(dict(headers) if headers else {})
+        startPosition = board.toFEN()
+        if startPosition != STANDARD_POSITION:
+            game.headers["SetUp"] = "1"
+            game.headers["FEN"] = startPosition
+        for move in reversed(moves):
+            game.moves.append(toSAN(board, move))
+            board.push(move)
+        return game
+
+def _getColor(board: Board) -> PieceColor:
+    return PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK
+
+def _pieceName(board: Board, location: Location) -> str:
+    piece = board.squares[location.index].currentPiece
+    return piece.name if piece else None
+
+def parseSAN(board: Board, san: str) -> Move:
+    # resolves a move in standard algebraic notation against the legal moves of the side to move
+    text = san.rstrip("+#!?")
+    moves = board.generateLegalMoves(_getColor(board))
+    if text.replace("0", "O") in ["O-O", "O-O-O"]:
+        rank = 0 if board.whiteToMove else 7
+        target = Location(rank, File.G if text.replace("0", "O") == "O-O" else File.C)
+        for move in moves:
+            if move.fromLocation == Location(rank, File.E) and move.toLocation == target and _pieceName(board, move.fromLocation) == "K":
+                return move
+        raise ValueError("illegal move: " + san)
+    match = SAN_REGEX.match(text)
+    if not match:
+        raise ValueError("invalid move: " + san)
+    name, fromFile, fromRank, target, promotion = match.groups()
+    name = name or "P"
+    toLocation = Location(int(target[1]) - 1, File[target[0].upper()])
+    candidates = [move for move in moves
+                  if move.toLocation == toLocation and move.promotion == promotion
+                  and _pieceName(board, move.fromLocation) == name
+                  and (fromFile is None or move.fromLocation.file.name == fromFile.upper())
+                  and (fromRank is None or move.fromLocation.rank == int(fromRank) - 1)]
+    if len(candidates) != 1:
+        raise ValueError(("ambiguous" if candidates else "illegal") + " move: " + san)
+    return candidates[0]
+
+def toSAN(board: Board, move: Move) -> str:
+    # standard algebraic notation of a legal move in the current position, incl. check and mate suffixes
+    name = _pieceName(board, move.fromLocation)
+    fileOffset = move.toLocation.file.value - move.fromLocation.file.value
+    target = str(move.toLocation).lower()
+    isCapture = board.squares[move.toLocation.index].isOccupied
+    if name == "K" and abs(fileOffset) == 2:
+        san = "O-O" if fileOffset > 0 else "O-O-O"
+    elif name == "P":
+        san = (move.fromLocation.file.name.lower() + "x" if fileOffset != 0 else "") + target
+        san += ("=" + move.promotion) if move.promotion else ""
+    else:
+        # disambiguate by file, then rank, then both
+        others = [other.fromLocation for other in board.generateLegalMoves(_getColor(board))
+                  if other.toLocation == move.toLocation and other.fromLocation != move.fromLocation
+                  and _pieceName(board, other.fromLocation) == name]
+        disambiguation = ""
+        if others:
+            if all(other.file != move.fromLocation.file for other in others):
+                disambiguation = move.fromLocation.file.name.lower()
+            elif all(other.rank != move.fromLocation.rank for other in others):
+                disambiguation = str(move.fromLocation.rank + 1)
+            else:
+                disambiguation = str(move.fromLocation).lower()
+        san = name + disambiguation + ("x" if isCapture else "") + target
+    board.push(move)
+    color = _getColor(board)
+    if board.isInCheck(color):
+        san += "#" if not board.generateLegalMoves(color) else "+"
+    board.pop()
+    return san
+
+def readGames(handle: TextIO) -> Iterator[PGNGame]:
+    # yields the games of a PGN file one by one; variations, comments and NAGs are skipped
+    game = None
+    commentDepth = 0            # inside {...}
+    variationDepth = 0          # inside (...)
+    for line in handle:
+        line = line.strip()
+        if commentDepth == 0 and line.startswith("%"):
+            continue            # escape mechanism, the line is ignored
+        if commentDepth == 0 and variationDepth == 0 and line.startswith("["):
+            header = HEADER_REGEX.match(line)
+            if header:
+                if game is not None and game.moves:
+                    yield game          # game without termination marker
+                    game = None
+                if game is None:
+                    game = PGNGame()
+                game.headers[header.group(1)] = header.group(2).replace('\\"', '"').replace("\\\\", "\\")
+                continue
+        for token in TOKEN_REGEX.findall(line):
+            if commentDepth > 0:
+                if token == "}":
+                    commentDepth = 0
+                continue
+            if token == "{":
+                commentDepth = 1
+            elif token == ";":
+                break                   # comment up to the end of the line
+            elif token == "(":
+                variationDepth += 1
+            elif token == ")":
+                variationDepth = max(0, variationDepth - 1)
+            elif variationDepth > 0 or token.startswith("$"):
+                continue
+            elif token in RESULTS:
+                if game is None:
+                    game = PGNGame()
+                game.headers.setdefault("Result", token)
+                yield game
+                game = None
+            else:
+                token = MOVE_NUMBER_REGEX.sub("", token)
+                if token:
+                    if game is None:
+                        game = PGNGame()
+                    game.moves.append(token)
+    if game is not None and (game.moves or game.headers):
+        yield game
+
+def writeGame(handle: TextIO, game: PGNGame, lineLength: int = 80) -> None:
+    # seven tag roster first (with PGN's default values), then the remaining headers and the movetext
+    headers = {"Event": "?", "Site": "?", "Date": "????.??.??", "Round": "?", "White": "?", "Black": "?", "Result": "*"}
+    headers.update(game.headers)
+    for name in SEVEN_TAG_ROSTER + [name for name in headers if name not in SEVEN_TAG_ROSTER]:
+        handle.write("[" + name + ' "' + headers[name].replace("\\", "\\\\").replace('"', '\\"') + '"]\n')
+    handle.write("\n")
+
+    # move numbers continue from the FEN header, if any
+    fullmoveNumber, whiteToMove = 1, True
+    if "FEN" in headers:
+        fields = headers["FEN"].split()
+        whiteToMove = fields[1] == "w"
+        fullmoveNumber = int(fields[5]) if len(fields) > 5 else 1
+    tokens = []
+    for index, san in enumerate(game.moves):
+        if whiteToMove:
+            tokens.append(str(fullmoveNumber) + ".")
+        elif index == 0:
+            tokens.append(str(fullmoveNumber) + "...")
+        tokens.append(san)
+        if not whiteToMove:
+            fullmoveNumber += 1
+        whiteToMove = not whiteToMove
+    tokens.append(headers["Result"])
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > lineLength:
+            handle.write(line + "\n")
+            line = token
+        else:
+            line = (line + " " + token) if line else token
+    handle.write(line + "\n\n")
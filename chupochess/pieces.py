@@ -5,6 +5,9 @@ from chupochess.board import Board
 from chupochess.interfaces import MovableInterface
 from chupochess.common import PieceColor, Location, LocationFactory, File, LocationDictionary
 from chupochess.squares import Square
+from chupochess.attacks import KNIGHT_TARGETS, KING_TARGETS, PAWN_TARGETS, RAY_MASKS, BETWEEN, LINES, DIRECTION, \
+    iterBits, firstBlocker, bishopAttacks, rookAttacks, queenAttacks
+from chupochess.bitboards import BISHOP, ROOK, QUEEN
 
 class Piece:
     def __init__(self, color: PieceColor) -> None:
@@ -18,53 +21,47 @@ class Piece:
             + ",color=" + str(self.color.name) + "}"
 
     def _switchSquaresAndCapture(self, targetSquare: Square, board: Board) -> None:
-        self.currentSquare.reset()
-        self.currentSquare = targetSquare
-        board.updatePieceList(targetSquare.reset()) # make capture if there is sth to capture
-        targetSquare.currentPiece = self
-        targetSquare.isOccupied = True
-        board.whiteToMove = not board.whiteToMove
+        board._removePiece(self.currentSquare)
+        capturedPiece = board._removePiece(targetSquare)
+        board.updatePieceList(capturedPiece) # make capture if there is sth to capture
+        board._placePiece(self, targetSquare)
+        board._completeMove(capturedPiece is not None or self.name == "P")
 
     def isPinnedBy(self, board: Board, square: Square = None) -> Self:     # returns the "pinning" piece
         if square == None: square = self.currentSquare
-        kingLocation = board.getKingLocation(self.color)
-        squareMap = board.locationSquareMap
+        kingIndex = board.getKingLocation(self.color).index
+        index = square.location.index
         # check if active piece is on a "attack path" relative to king:
-        locationOffset = kingLocation.offset(square.location)
-        if abs(locationOffset[0]) == abs(locationOffset[1]):
-            # possible attackers: B/Q
-            offset = (int(locationOffset[0]/abs(locationOffset[0])), int(locationOffset[1]/abs(locationOffset[1])))
-            next = LocationFactory.build(kingLocation, offset[0], offset[1])
-            relevantIndex = 0       # for bishops, absolute rank and file offsets should always be the same -> irrelevant
-            attackers = ["B","Q"]
-        elif (locationOffset[0] == 0 or locationOffset[1] == 0):
-            # possible attackers: R/Q
-            relevantIndex = 0 if locationOffset[1] == 0 else 1
-            offset = (0 if relevantIndex == 1 else int(locationOffset[0]/abs(locationOffset[0])),
-                      0 if relevantIndex == 0 else int(locationOffset[1]/abs(locationOffset[1])))
-            next = LocationFactory.build(kingLocation, offset[0], offset[1])
-            attackers = ["R", "Q"]
-        else:
+        direction = DIRECTION[kingIndex][index]
+        if direction is None:
+            return None
+        occupied = board.bitboards.occupied
+        if BETWEEN[kingIndex][index] & occupied:
+            # king is protected by other piece -> no pin!
+            return None
+        blockers = RAY_MASKS[direction][index] & occupied
+        if not blockers:
             return None
-        while next in squareMap:
-            if (squareMap[next].isOccupied == False) or (next == square.location):
-                next = LocationFactory.build(next, offset[0], offset[1])
-            elif abs(kingLocation.offset(next)[relevantIndex]) < abs(locationOffset[relevantIndex]): 
-                # king is protected by other piece -> no pin!
-                return None
-            elif squareMap[next].currentPiece.color == self.color:
-                # ally found -> no pin!
-                return None
-            elif (squareMap[next].currentPiece.color == self.color.Not()) and (squareMap[next].currentPiece.name not in attackers):
-                # potential attacker is blocked by other opponent piece -> no pin!
-                return None
-            else: 
-                # attacker found:
-                return squareMap[next].currentPiece
+        attacker = board.squares[firstBlocker(direction, blockers)].currentPiece
+        # possible attackers: B/Q on diagonals (directions 4-7), R/Q on ranks and files (directions 0-3)
+        attackers = ["B", "Q"] if direction >= 4 else ["R", "Q"]
+        if attacker.color != self.color and attacker.name in attackers:
+            return attacker
+        # ally or an opponent piece that can't attack on this line -> no pin!
+        return None
+
+    def _getSlidingMoves(self, board: Board, square: Square, attacks: int, includeDefendedLocations: bool) -> List[Location]:
+        if not includeDefendedLocations:
+            attacks &= ~board.bitboards.colors[self.color.value]
+        # check if piece is pinned -> only movement on the line between king and attacker possible:
+        if self.isPinnedBy(board, square):
+            attacks &= LINES[board.getKingLocation(self.color).index][square.location.index]
+        squares = board.squares
+        return self._getGlobalValidMoves([squares[index].location for index in iterBits(attacks)], board)
 
     def _getGlobalValidMoves(self, moves: List[Location], board: Board) -> List[Location]:
         # verifies if the king is in check and returns the list of valid moves from a global point of view
-        king = board.locationSquareMap[board.getKingLocation(self.color)].currentPiece
+        king = board.getSquare(board.getKingLocation(self.color)).currentPiece
         inCheck = king.isInCheck(board)         
         if len(inCheck) == 0:
             return moves       
@@ -104,19 +101,15 @@ class King(Piece, MovableInterface):
     def __init__(self, color: PieceColor) -> None:
         Piece.__init__(self, color)
         self.name = "K"
-        self.bishop = Bishop(color)
-        self.rook = Rook(color)
         self.isFirstMove = True         
 
     def getValidMoves(self, board: Board) -> List[Location]:
         moveCandidates = []
-        offsets = [(0, 1), (1, 1), (1, 0), (1, -1), (0,-1), (-1, -1), (-1, 0), (-1, 1)]
-        for offset in offsets:
-            moveCandidates.append(LocationFactory.build(self.currentSquare.location, offset[0], offset[1]))
-        # filter locations that are not on the board:
-        moveCandidates[:] = filterfalse(lambda candidate : candidate not in board.locationSquareMap, moveCandidates)
-        # filter locations that are blocked by ally pieces:
-        moveCandidates[:] = filterfalse(lambda candidate : (board.locationSquareMap[candidate].isOccupied) and (board.locationSquareMap[candidate].currentPiece.color == self.color), moveCandidates)
+        squares = board.squares
+        for index in KING_TARGETS[self.currentSquare.location.index]:
+            # filter locations that are blocked by ally pieces:
+            if not (squares[index].isOccupied and squares[index].currentPiece.color == self.color):
+                moveCandidates.append(squares[index].location)
         moveCandidates.extend(self.getCastlingRights(board))
         # "in check" detection for move candidates: 
         locationsUnderAttack = []
@@ -128,35 +121,30 @@ class King(Piece, MovableInterface):
         return moveCandidates
 
     def getDefendedLocations(self, board: Board) -> List[Location]:
-        defendedLocations = []
-        offsets = [(0, 1), (1, 1), (1, 0), (1, -1), (0,-1), (-1, -1), (-1, 0), (-1, 1)]
-        for offset in offsets:
-            defendedLocations.append(LocationFactory.build(self.currentSquare.location, offset[0], offset[1]))
-        # filter locations that are not on the board:
-        defendedLocations[:] = filterfalse(lambda candidate : candidate not in board.locationSquareMap, defendedLocations)
-        return defendedLocations
+        return [board.squares[index].location for index in KING_TARGETS[self.currentSquare.location.index]]
 
     def makeMove(self, square: Square, board: Board) -> None:
+        rank = self.currentSquare.location.rank
         if abs(self.currentSquare.location.file.value - square.location.file.value) > 1:
             # castling move -> move rook, too:
-            rooks = board.getPieceList(self.color)
             if square.location.file == File.G:
                 # short castle -> rook has to be moved from file H to F
-                rooks[:] = filterfalse(lambda piece : (piece.name != "R") or (piece.currentSquare.location != Location(self.currentSquare.location.rank, File.H)), rooks)
-                rooks[0].makeMove(board.locationSquareMap[Location(self.currentSquare.location.rank, File.F)], board)
+                rook = board.getSquare(Location(rank, File.H)).currentPiece
+                rookTarget = board.getSquare(Location(rank, File.F))
             else:
                 # long castle -> rook has to be moved from file A to D
-                rooks[:] = filterfalse(lambda piece : (piece.name != "R") or (piece.currentSquare.location != Location(self.currentSquare.location.rank, File.A)), rooks)
-                rooks[0].makeMove(board.locationSquareMap[Location(self.currentSquare.location.rank, File.D)], board)
-            board.whiteToMove = not board.whiteToMove      
+                rook = board.getSquare(Location(rank, File.A)).currentPiece
+                rookTarget = board.getSquare(Location(rank, File.D))
+            rook.isFirstMove = False
+            board._removePiece(rook.currentSquare)
+            board._placePiece(rook, rookTarget)
         self.isFirstMove = False
-        self._switchSquaresAndCapture(square, board)
-
         if self.color == PieceColor.WHITE:
-            board.whiteKingLocation = self.currentSquare.location
+            board.whiteKingLocation = square.location
         else:
-            board.blackKingLocation = self.currentSquare.location
+            board.blackKingLocation = square.location
         board.enPassantPossible.clear()
+        self._switchSquaresAndCapture(square, board)
 
     def getCastlingRights(self, board: Board) -> List[Location]:
         castlingRights = []
@@ -195,46 +183,18 @@ class King(Piece, MovableInterface):
         return castlingRights
 
     def _castlingSquareUnderAttack(self, fileOffset: int, board: Board) -> bool:
-        squareMap = board.locationSquareMap
-        # TODO: refactor: locations in 2nd/7th file are build multiple times (checked for king, then for pawns, then for bishop/rook/queen)
-        
-        # potential attacker: opponents king
-        offsets = [(-1,1),(0,1),(1,1)] if self.color == PieceColor.WHITE else [(-1,-1),(0,-1),(1,-1)]
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(self.currentSquare.location, fileOffset + offset[0], offset[1])
-            if attackerLocation in squareMap and squareMap[attackerLocation].isOccupied and squareMap[attackerLocation].currentPiece.name == "P" and squareMap[attackerLocation].currentPiece.color != self.color:
-                return True
-
-        # potential attacker: pawn 
-        offsets = [(-1,1),(1,1)] if self.color == PieceColor.WHITE else [(-1,-1),(1,-1)]
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(self.currentSquare.location, fileOffset + offset[0], offset[1])
-            if attackerLocation in squareMap and squareMap[attackerLocation].isOccupied and squareMap[attackerLocation].currentPiece.name == "P" and squareMap[attackerLocation].currentPiece.color != self.color:
-                return True
-
-        # potential attacker: knight -> offset: List[Tupel[file: int, rank: int]]
-        offsets = [(-2,1),(-1,2),(1,2),(2,1)] if self.color == PieceColor.WHITE else [(2,-1),(1,-2),(-1,-2),(-2,-1)]    
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(self.currentSquare.location, fileOffset + offset[0], offset[1])
-            if attackerLocation in squareMap and squareMap[attackerLocation].isOccupied and squareMap[attackerLocation].currentPiece.name == "N" and squareMap[attackerLocation].currentPiece.color != self.color:
-                return True
-
-        # potential attacker: rook/queen/bishop -> offset: List[Tupel[file: int, rank: int, relevantAttackers: List[str]]]
-        if self.color == PieceColor.WHITE:
-            offsets = [(-1,1,["B","Q"]),(1,1,["B","Q"]),(0,1,["R","Q"]),(int(fileOffset / abs(fileOffset)),0,["R","Q"])]
-        else:
-            offsets = [(-1,-1,["B","Q"]),(1,-1,["B","Q"]),(0,-1,["R","Q"]),(int(fileOffset / abs(fileOffset)),0,["R","Q"])]
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(self.currentSquare.location, fileOffset + offset[0], offset[1])
-            while attackerLocation in squareMap:
-                if squareMap[attackerLocation].isOccupied:
-                    if squareMap[attackerLocation].currentPiece.color != self.color and (squareMap[attackerLocation].currentPiece.name in offset[2]):
-                        return True
-                    else:
-                        break
-                attackerLocation = LocationFactory.build(attackerLocation, offset[0], offset[1])
-        
-        return False
+        squares = board.squares
+        index = self.currentSquare.location.index + fileOffset
+
+        # potential attackers: opponents king, pawn and knight
+        for attackerTable, attackerName in [(KING_TARGETS[index], "K"), (PAWN_TARGETS[self.color.value][index], "P"), (KNIGHT_TARGETS[index], "N")]:
+            for attackerIndex in attackerTable:
+                attacker = squares[attackerIndex].currentPiece
+                if attacker and attacker.name == attackerName and attacker.color != self.color:
+                    return True
+
+        # potential attacker: rook/queen/bishop
+        return self._slidingAttackers(board, index, board.bitboards.occupied) != 0
         
     
     def isInCheck(self, board: Board) -> List[Location]: #returns locations of immediate attackers (0, 1 or 2)
@@ -244,69 +204,42 @@ class King(Piece, MovableInterface):
     def _locationUnderAttack(self, board: Board, location: Location) -> List[Location]:
         # check whether King is under immediate attack:
         attackers = []
-        squareMap = board.locationSquareMap
-        # potential attacker: pawn 
-        offsets = [(-1,1),(1,1)] if self.color == PieceColor.WHITE else [(-1,-1),(1,-1)]
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(location, offset[0], offset[1])
-            if attackerLocation in squareMap and squareMap[attackerLocation].isOccupied and squareMap[attackerLocation].currentPiece.name == "P" and squareMap[attackerLocation].currentPiece.color != self.color:
-                attackers.append(attackerLocation)
-
-        # potential attacker: knight -> offset: List[Tupel[file: int, rank: int]]
-        offsets = [(-2,1),(-1,2),(1,2),(2,1),(2,-1),(1,-2),(-1,-2),(-2,-1)]    
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(location, offset[0], offset[1])
-            if attackerLocation in squareMap and squareMap[attackerLocation].isOccupied and squareMap[attackerLocation].currentPiece.name == "N" and squareMap[attackerLocation].currentPiece.color != self.color:
-                attackers.append(attackerLocation)
-
-        # potential attacker: rook/queen/bishop -> offset: List[Tupel[file: int, rank: int, relevantAttackers: List[str]]]
-        offsets = [
-            (1,1,["B","Q"]),
-            (1,-1,["B","Q"]),
-            (-1,1,["B","Q"]),
-            (-1,-1,["B","Q"]),
-            (0,1,["R","Q"]),
-            (0,-1,["R","Q"]),
-            (1,0,["R","Q"]),
-            (-1,0,["R","Q"])
-        ]
-        for offset in offsets:
-            attackerLocation = LocationFactory.build(location, offset[0], offset[1])
-            while attackerLocation in squareMap:
-                if squareMap[attackerLocation].isOccupied:
-                    if squareMap[attackerLocation].currentPiece.color != self.color and (squareMap[attackerLocation].currentPiece.name in offset[2]):
-                        attackers.append(attackerLocation)
-                        break
-                    elif squareMap[attackerLocation].currentPiece == self:
-                        # special case: since the king still is not in target position, it could be possible that an attacker is located behind the king
-                        pass
-                    else:
-                        break
-                attackerLocation = LocationFactory.build(attackerLocation, offset[0], offset[1])
+        squares = board.squares
+        # potential attackers: pawn, knight and opponents king
+        for attackerTable, attackerName in [(PAWN_TARGETS[self.color.value][location.index], "P"), (KNIGHT_TARGETS[location.index], "N"), (KING_TARGETS[location.index], "K")]:
+            for attackerIndex in attackerTable:
+                attacker = squares[attackerIndex].currentPiece
+                if attacker and attacker.name == attackerName and attacker.color != self.color:
+                    attackers.append(squares[attackerIndex].location)
+
+        # potential attacker: rook/queen/bishop
+        # special case: since the king still is not in target position, it could be possible that an attacker is located behind the king
+        occupied = board.bitboards.occupied & ~(1 << self.currentSquare.location.index)
+        for attackerIndex in iterBits(self._slidingAttackers(board, location.index, occupied)):
+            attackers.append(squares[attackerIndex].location)
         return attackers
 
+    def _slidingAttackers(self, board: Board, index: int, occupied: int) -> int:
+        opponent = board.bitboards.pieces[self.color.Not().value]
+        return (bishopAttacks(index, occupied) & (opponent[BISHOP] | opponent[QUEEN])) \
+            | (rookAttacks(index, occupied) & (opponent[ROOK] | opponent[QUEEN]))
+
 class Queen(Piece, MovableInterface):
     def __init__(self, color: PieceColor) -> None:
         Piece.__init__(self, color)
         self.name = "Q"
-        self.bishop = Bishop(color)
-        self.rook = Rook(color)
 
-    def getValidMoves(self, board: Board) -> List[Location]:
-        moveCandidates = []
-        moveCandidates.extend(self.bishop.getValidMoves(board, self.currentSquare))  
-        moveCandidates.extend(self.rook.getValidMoves(board, self.currentSquare))   
-        return moveCandidates
+    def getValidMoves(self, board: Board, square: Square = None, includeDefendedLocations: bool = False) -> List[Location]:
+        if square == None: square = self.currentSquare
+        attacks = queenAttacks(square.location.index, board.bitboards.occupied)
+        return self._getSlidingMoves(board, square, attacks, includeDefendedLocations)
 
-    def getDefendedLocations(self, board: Board) -> List[Location]:
-        defendedLocations = []
-        defendedLocations.extend(self.bishop.getDefendedLocations(board, self.currentSquare))
-        defendedLocations.extend(self.rook.getDefendedLocations(board, self.currentSquare))
-        return defendedLocations
+    def getDefendedLocations(self, board: Board, square: Square = None) -> List[Location]:
+        return self.getValidMoves(board, square, True)
     
     def makeMove(self, square: Square, board: Board) -> None:
-        self._switchSquaresAndCapture(square, board)
         board.enPassantPossible.clear()
+        self._switchSquaresAndCapture(square, board)
 
 class Bishop(Piece, MovableInterface):
     def __init__(self, color: PieceColor) -> None:
@@ -315,49 +248,15 @@ class Bishop(Piece, MovableInterface):
 
     def getValidMoves(self, board: Board, square: Square = None, includeDefendedLocations: bool = False) -> List[Location]:
         if square == None: square = self.currentSquare
-        squareMap = board.locationSquareMap
-        offsets = [(-1,1), (1,1), (-1, -1), (1,-1)]
-        moveCandidates = []
-        for offset in offsets:
-            # explore the field in every possible direction (rankwise and filewise)
-            next = LocationFactory.build(square.location, offset[0], offset[1])
-            while (next in squareMap):
-                if squareMap[next].isOccupied:
-                    if squareMap[next].currentPiece.color == self.color:
-                        if includeDefendedLocations:
-                            moveCandidates.append(next)
-                        break
-                    moveCandidates.append(next)
-                    break
-                moveCandidates.append(next)
-                next = LocationFactory.build(next, offset[0], offset[1])
-        # check if piece is pinned:
-        attacker = self.isPinnedBy(board, square)
-        if attacker:
-            attackerOffset = square.location.offset(attacker.currentSquare.location)
-            if 0 in attackerOffset:
-                # attacker on the same rank or file -> no movement possible
-                moveCandidates.clear()
-            else:
-                # attacker on the same diagonal -> limited movement possible
-                # (only in direction of offset or in inverse direction)
-                moveCandidates[:] = filterfalse(lambda candidate : \
-                    (int(candidate.offset(square.location)[0]/abs(candidate.offset(square.location)[0])),
-                    candidate.offset(square.location)[1]/abs(candidate.offset(square.location)[1])) 
-                    not in self._limitMovementPinnedBishop(attackerOffset), moveCandidates)
-        return self._getGlobalValidMoves(moveCandidates, board)
+        attacks = bishopAttacks(square.location.index, board.bitboards.occupied)
+        return self._getSlidingMoves(board, square, attacks, includeDefendedLocations)
 
-    def _limitMovementPinnedBishop(self, attackerOffset: Tuple[int,int]) -> Tuple[Tuple[int,int], Tuple[int,int]]:
-        norm = (int(attackerOffset[0]/abs(attackerOffset[0])),int(attackerOffset[1]/abs(attackerOffset[1])))
-        inv = (-norm[0], -norm[1])
-        return (norm, inv)
-                
     def getDefendedLocations(self, board: Board, square: Square = None) -> List[Location]:
         return self.getValidMoves(board, square, True)
 
     def makeMove(self, square: Square, board: Board) -> None:
-        self._switchSquaresAndCapture(square, board)
         board.enPassantPossible.clear()
+        self._switchSquaresAndCapture(square, board)
 
 class Knight(Piece, MovableInterface):
     def __init__(self, color: PieceColor) -> None:
@@ -366,28 +265,26 @@ class Knight(Piece, MovableInterface):
 
     def getValidMoves(self, board: Board, includeDefendedLocations: bool = False) -> List[Location]:
         moveCandidates = []
-        squareMap = board.locationSquareMap
-        offsets = [(-2,1),(-1,2),(1,2),(2,1),(2,-1),(1,-2),(-1,-2),(-2,-1)]
+        squares = board.squares
         if self.isPinnedBy(board):
             # knight is pinned -> no movement possible
             return moveCandidates
-        for offset in offsets:
-            next = LocationFactory.build(self.currentSquare.location, offset[0], offset[1])
-            if next in squareMap:
-                if squareMap[next].isOccupied == False:
-                    moveCandidates.append(next)
-                elif squareMap[next].currentPiece.color != self.color:
-                    moveCandidates.append(next)
-                elif includeDefendedLocations:
-                    moveCandidates.append(next)
+        for index in KNIGHT_TARGETS[self.currentSquare.location.index]:
+            square = squares[index]
+            if square.isOccupied == False:
+                moveCandidates.append(square.location)
+            elif square.currentPiece.color != self.color:
+                moveCandidates.append(square.location)
+            elif includeDefendedLocations:
+                moveCandidates.append(square.location)
         return self._getGlobalValidMoves(moveCandidates, board)
 
     def getDefendedLocations(self, board: Board) -> List[Location]:
         return self.getValidMoves(board, True)
 
     def makeMove(self, square: Square, board: Board) -> None:
-        self._switchSquaresAndCapture(square, board)
         board.enPassantPossible.clear()
+        self._switchSquaresAndCapture(square, board)
 
 class Rook(Piece, MovableInterface):
     def __init__(self, color: PieceColor) -> None:
@@ -397,43 +294,16 @@ class Rook(Piece, MovableInterface):
 
     def getValidMoves(self, board: Board, square: Square = None, includeDefendedLocations: bool = False) -> List[Location]:
         if square == None: square = self.currentSquare
-        squareMap = board.locationSquareMap
-        offsets = [(-1,0), (1,0), (0, -1), (0,1)]
-        moveCandidates = [] 	
-        for offset in offsets:
-            # explore the field in every possible direction (rankwise and filewise)
-            next = LocationFactory.build(square.location, offset[0], offset[1])
-            while (next in squareMap):
-                if squareMap[next].isOccupied:
-                    if squareMap[next].currentPiece.color == self.color:
-                        if includeDefendedLocations:
-                            moveCandidates.append(next)
-                        break
-                    moveCandidates.append(next)
-                    break
-                moveCandidates.append(next)
-                next = LocationFactory.build(next, offset[0], offset[1])
-        # check if piece is pinned:
-        attacker = self.isPinnedBy(board, square)
-        if attacker:
-            attackerOffset = square.location.offset(attacker.currentSquare.location)
-            if 0 in attackerOffset: 
-                # attacker on same rank or file -> limited movement possible
-                # (only in direction of offset or in inverse direction)
-                noMovementIndex = 0 if attackerOffset[0] == 0 else 1
-                moveCandidates[:] = filterfalse(lambda candidate : candidate.offset(square.location)[noMovementIndex] != 0, moveCandidates)
-            else:
-                # attacker attacking diagonally -> no movement possible
-                moveCandidates.clear()
-        return self._getGlobalValidMoves(moveCandidates, board)
+        attacks = rookAttacks(square.location.index, board.bitboards.occupied)
+        return self._getSlidingMoves(board, square, attacks, includeDefendedLocations)
 
     def getDefendedLocations(self, board: Board, square: Square = None) -> List[Location]:
         return self.getValidMoves(board, square, True)
 
     def makeMove(self, square: Square, board: Board) -> None:
         self.isFirstMove = False
-        self._switchSquaresAndCapture(square, board)
         board.enPassantPossible.clear()
+        self._switchSquaresAndCapture(square, board)
         
 
 class Pawn(Piece,MovableInterface):
@@ -491,33 +361,28 @@ class Pawn(Piece,MovableInterface):
         return (norm, inv)
 
     def getDefendedLocations(self, board: Board) -> List[Location]:
-        currentLocation = self.currentSquare.location
-        defendedLocations = []
-        rankOffset = 1 if self.color == PieceColor.WHITE else -1
-        defendedLocations.append(LocationFactory.build(currentLocation, 1, rankOffset))
-        defendedLocations.append(LocationFactory.build(currentLocation, -1, rankOffset))
-        defendedLocations[:] = filterfalse(lambda candidate : candidate not in board.locationSquareMap, defendedLocations)
-        return defendedLocations
+        return [board.squares[index].location for index in PAWN_TARGETS[self.color.value][self.currentSquare.location.index]]
 
-    def makeMove(self, square: Square, board: Board) -> None:
+    def makeMove(self, square: Square, board: Board, cls: type = None) -> None:
+        # cls: class of the piece to promote to (default: Queen)
         if self.isFirstMove:
             self.isFirstMove = False
             if abs(self.currentSquare.location.rank - square.location.rank) > 1:
                 board.enPassantPossible.clear()
                 board.enPassantPossible.append(self)        
-        # capture other pawn if en passant move:
-        if (len(board.enPassantPossible) > 0) and (square.location.file != self.currentSquare.location.file):
+        # capture other pawn if en passant move (diagonal move to the empty square behind it):
+        if (len(board.enPassantPossible) > 0) and (square.location.file != self.currentSquare.location.file) and not square.isOccupied:
             for enPassant in board.enPassantPossible:
                 if (enPassant.color != self.color) and (enPassant.currentSquare.location.file == square.location.file):
-                    board.updatePieceList(enPassant.currentSquare.reset())
+                    board.updatePieceList(board._removePiece(enPassant.currentSquare))
                     board.enPassantPossible.clear()
                     break
+        if not self in board.enPassantPossible:
+            board.enPassantPossible.clear()
         if self._isPawnPromotionMove(square, board):
-            self._promotePawn(square, board)
+            self._promotePawn(square, board, cls if cls else Queen)
         else:
             self._switchSquaresAndCapture(square, board)
-        if not self in board.enPassantPossible:
-            board.enPassantPossible.clear()
 
     def _isPawnPromotionMove(self, targetSquare: Square, board: Board) -> bool:
         if self.color == PieceColor.WHITE:
@@ -527,15 +392,15 @@ class Pawn(Piece,MovableInterface):
 
     def _promotePawn(self, targetSquare: Square, board: Board, cls: Piece = Queen):
         # TODO: interface for really choosing the cls -> e.g. promoting to a Knight, too
-        board.updatePieceList(self.currentSquare.reset())
+        board.updatePieceList(board._removePiece(self.currentSquare))
         if targetSquare.isOccupied: 
-            board.updatePieceList(targetSquare.reset())     # make capture if there is sth to capture
+            board.updatePieceList(board._removePiece(targetSquare))     # make capture if there is sth to capture
         promotedPiece = cls(self.color)
-        promotedPiece.currentSquare = targetSquare
-        targetSquare.currentPiece = promotedPiece
-        targetSquare.isOccupied = True
-        board.whiteToMove = not board.whiteToMove
+        if hasattr(promotedPiece, "isFirstMove"):
+            promotedPiece.isFirstMove = False       # a promoted rook never gives castling rights
+        board._placePiece(promotedPiece, targetSquare)
         board.appendPieceList(promotedPiece)
+        board._completeMove(True)
         
 
 class PieceFactory:
@@ -575,4 +440,7 @@ class PieceFactory:
         pieces[Location(0, File.E)] = King(PieceColor.WHITE)
         pieces[Location(7, File.E)] = King(PieceColor.BLACK)
         
-        return pieces
\ No newline at end of file
+        return pieces
+
+    def getPieceClass(name: str) -> type:
+        return {"K": King, "Q": Queen, "B": Bishop, "N": Knight, "R": Rook, "P": Pawn}[name]
\ No newline at end of file
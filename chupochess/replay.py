@@ -0,0 +1,121 @@
+import argparse
+import itertools
+import multiprocessing
+import time
+from collections import Counter, deque
+from typing import Iterable, Iterator, List, Tuple
+from chupochess.common import BoardBackend
+from chupochess.pgn import PGNGame, readGames, parseSAN
+
+# bulk replay of recorded games: batches of games are replayed in worker processes, which only send back
+# their aggregated statistics (no Board objects cross process boundaries)
+
+class ReplayStats:
+    def __init__(self, openingPlies: int = 6) -> None:
+        self.openingPlies = openingPlies
+        self.games = 0
+        self.results = Counter()            # "1-0", "0-1", "1/2-1/2", "*"
+        self.lengths = Counter()            # game length in plies -> number of games
+        self.openings = Counter()           # first 'openingPlies' moves in SAN -> number of games
+        self.illegalMoves = []              # (game number, ply, move, reason)
+
+    def add(self, gameNumber: int, game: PGNGame, backend: BoardBackend = BoardBackend.BITBOARD) -> None:
+        # replays the game, every move is checked against the legal moves of the position
+        self.games += 1
+        self.results[game.result] += 1
+        plies = 0
+        try:
+            board = game.getBoard(backend)
+            for san in game.moves:
+                board.push(parseSAN(board, san))
+                plies += 1
+        except (ValueError, KeyError, IndexError) as error:
+            self.illegalMoves.append((gameNumber, plies + 1, game.moves[plies] if plies < len(game.moves) else "", str(error)))
+        self.lengths[plies] += 1
+        if plies >= self.openingPlies:
+            self.openings[" ".join(game.moves[:self.openingPlies])] += 1
+
+    def merge(self, other: "ReplayStats") -> None:
+        self.games += other.games
+        self.results.update(other.results)
+        self.lengths.update(other.lengths)
+        self.openings.update(other.openings)
+        self.illegalMoves.extend(other.illegalMoves)
+
+    def getAverageLength(self) -> float:
+        return sum(plies * count for plies, count in self.lengths.items()) / self.games if self.games else 0.0
+
+    def __str__(self) -> str:
+        lines = ["games: " + str(self.games)]
+        lines.append("results: " + ", ".join(result + " " + str(count) for result, count in self.results.most_common()))
+        if self.lengths:
+            lines.append("length (plies): average %.1f, min %d, max %d" % (self.getAverageLength(), min(self.lengths), max(self.lengths)))
+        lines.append("illegal moves: " + str(len(self.illegalMoves)))
+        for gameNumber, ply, move, reason in self.illegalMoves[:10]:
+            lines.append("  game " + str(gameNumber) + ", ply " + str(ply) + ": " + move + " (" + reason + ")")
+        lines.append("most frequent openings:")
+        for opening, count in self.openings.most_common(10):
+            lines.append("  " + str(count) + ": " + opening)
+        return "\n".join(lines)
+
+def _replayBatch(batch: Tuple[int, List[Tuple[dict, List[str]]], int, BoardBackend]) -> ReplayStats:
+    # worker: (number of the first game, [(headers, moves), ...], opening plies, backend)
+    firstGame, games, openingPlies, backend = batch
+    stats = ReplayStats(openingPlies)
+    for offset, (headers, moves) in enumerate(games):
+        stats.add(firstGame + offset, PGNGame(headers, moves), backend)
+    return stats
+
+def _batches(games: Iterable[PGNGame], batchSize: int, openingPlies: int, backend: BoardBackend) -> Iterator[tuple]:
+    games = iter(games)
+    firstGame = 1
+    while True:
+        batch = [(game.headers, game.moves) for game in itertools.islice(games, batchSize)]
+        if not batch:
+            return
+        yield (firstGame, batch, openingPlies, backend)
+        firstGame += len(batch)
+
+def replayGames(games: Iterable[PGNGame], processes: int = None, batchSize: int = 200, openingPlies: int = 6,
+                backend: BoardBackend = BoardBackend.BITBOARD) -> ReplayStats:
+    # 'games' is consumed lazily: only a few batches per process are in flight at any time
+    stats = ReplayStats(openingPlies)
+    batches = _batches(games, batchSize, openingPlies, backend)
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1:
+        for batch in batches:
+            stats.merge(_replayBatch(batch))
+        return stats
+    with multiprocessing.Pool(processes) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(_replayBatch, (batch,)))
+            if len(pending) >= 2 * processes:
+                stats.merge(pending.popleft().get())
+        while pending:
+            stats.merge(pending.popleft().get())
+    return stats
+
+def main(args: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="replay the games of PGN files and collect statistics")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--opening-plies", type=int, default=6)
+    options = parser.parse_args(args)
+
+    def games():
+        for name in options.files:
+            with open(name, encoding="utf-8", errors="replace") as handle:
+                yield from readGames(handle)
+
+    start = time.perf_counter()
+    stats = replayGames(games(), options.processes, options.batch_size, options.opening_plies)
+    duration = time.perf_counter() - start
+    print(stats)
+    print("%.2fs (%d games/s)" % (duration, int(stats.games / duration) if duration > 0 else 0))
+    if stats.illegalMoves:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import time
+from typing import Callable, List
+from chupochess.board import Board
+from chupochess.common import Move, PieceColor
+from chupochess.bitboards import PIECE_TYPES
+from chupochess.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from chupochess.evaluation import PIECE_VALUES, evaluate
+
+# negamax alpha-beta search with iterative deepening; all moves are made and taken back on the one Board
+# with push()/pop(), so no positions are copied during the search
+
+MATE_SCORE = 100000
+MAX_PLY = 128
+INFINITE = MATE_SCORE + 1
+
+def isMateScore(score: int) -> bool:
+    return abs(score) >= MATE_SCORE - MAX_PLY
+
+def _toTableScore(score: int, ply: int) -> int:
+    # mate scores are stored relative to the position, not to the root
+    if score >= MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+def _fromTableScore(score: int, ply: int) -> int:
+    if score >= MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+class SearchAborted(Exception):
+    pass
+
+class SearchResult:
+    def __init__(self) -> None:
+        self.bestMove = None
+        self.score = 0                  # centipawns from the point of view of the side to move
+        self.depth = 0                  # last completed iteration
+        self.pv = []                    # principal variation
+        self.nodes = 0
+        self.time = 0.0                 # seconds
+
+    @property
+    def nps(self) -> int:
+        return int(self.nodes / self.time) if self.time > 0 else 0
+
+    def __str__(self) -> str:
+        return "depth " + str(self.depth) + " score " + str(self.score) + " nodes " + str(self.nodes) + " nps " + str(self.nps) \
+            + " pv " + " ".join(str(move) for move in self.pv)
+
+class Search:
+    def __init__(self, board: Board, table: TranspositionTable = None, stopEvent: object = None,
+                 tablebase: object = None) -> None:
+        self.board = board
+        self.table = table if table is not None else TranspositionTable()
+        self.tablebase = tablebase      # optional chupochess.tablebase.Tablebase, probed in positions with <= 4 pieces
+        self.nodes = 0
+        self.stopped = False            # set by stop(), e.g. from another thread
+        self.stopEvent = stopEvent      # optional multiprocessing.Event to stop the search from another process
+        self._nodeLimit = None
+        self._deadline = None
+        self._pvTable = [[] for _ in range(MAX_PLY + 1)]   # best line found below each ply
+        self._previousPV = []                               # principal variation of the last iteration
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def search(self, depth: int = None, nodes: int = None, movetime: float = None,
+               callback: Callable[[SearchResult], None] = None, startDepth: int = 1) -> SearchResult:
+        # iterative deepening until one of the limits (depth, nodes, movetime in seconds) is reached;
+        # 'callback' is called with the result of every completed iteration
+        board = self.board
+        start = time.perf_counter()
+        self.nodes = 0
+        self._nodeLimit = nodes
+        self._deadline = start + movetime if movetime is not None else None
+        maxDepth = min(depth, MAX_PLY) if depth is not None else MAX_PLY
+        rootStackSize = len(board.moveStack)
+        result = SearchResult()
+        self._previousPV = []
+        self.table.newSearch()
+        rootMoves = board.generateLegalMoves(self._getColor())
+        if rootMoves:
+            result.bestMove = rootMoves[0]          # fallback if not even depth 1 completes
+        for iteration in range(min(startDepth, maxDepth), maxDepth + 1):
+            try:
+                score = self._negamax(iteration, 0, -INFINITE, INFINITE)
+            except SearchAborted:
+                while len(board.moveStack) > rootStackSize:
+                    board.pop()
+                break
+            result.depth = iteration
+            result.score = score
+            result.pv = list(self._pvTable[0])
+            self._previousPV = result.pv
+            if result.pv:
+                result.bestMove = result.pv[0]
+            result.nodes = self.nodes
+            result.time = time.perf_counter() - start
+            if callback:
+                callback(result)
+            if not rootMoves or (isMateScore(score) and MATE_SCORE - abs(score) <= iteration):
+                break               # no need to search deeper than a forced mate
+        result.nodes = self.nodes
+        result.time = time.perf_counter() - start
+        self.stopped = False        # reset at the end: a stop() that arrives before the search starts is not lost
+        return result
+
+    def _getColor(self) -> PieceColor:
+        return PieceColor.WHITE if self.board.whiteToMove else PieceColor.BLACK
+
+    def _checkLimits(self) -> None:
+        if self.stopped or (self._nodeLimit is not None and self.nodes >= self._nodeLimit):
+            raise SearchAborted()
+        if (self.nodes & 1023) == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchAborted()
+            if self.stopEvent is not None and self.stopEvent.is_set():
+                raise SearchAborted()
+
+    def _orderMoves(self, moves: List[Move], ply: int, tableMove: Move = None) -> List[Move]:
+        # best move from the transposition table and principal variation move of the previous iteration first,
+        # then captures by victim/attacker value
+        squares = self.board.squares
+        pvMove = self._previousPV[ply] if ply < len(self._previousPV) else None
+
+        def priority(move: Move) -> int:
+            if move == tableMove:
+                return -200000
+            if move == pvMove:
+                return -100000
+            victim = squares[move.toLocation.index].currentPiece
+            score = 0
+            if victim:
+                score -= 10 * PIECE_VALUES[victim.name] - PIECE_TYPES[squares[move.fromLocation.index].currentPiece.name]
+            if move.promotion:
+                score -= PIECE_VALUES[move.promotion]
+            return score
+        moves.sort(key=priority)
+        return moves
+
+    def _negamax(self, depth: int, ply: int, alpha: int, beta: int) -> int:
+        leaf = depth == 0 or ply >= MAX_PLY
+        if not leaf:
+            self.nodes += 1             # leaves are counted by _quiescence
+            self._checkLimits()
+        board = self.board
+        pvLine = self._pvTable[ply]
+        if ply > 0 and (board.halfmoveClock >= 100 or board.positionCounts.get(board.keyHistory[-1], 0) >= 2):
+            pvLine.clear()
+            return 0                # fifty-move rule or repetition
+        if ply > 0 and self.tablebase is not None and len(board.whitePieces) + len(board.blackPieces) <= 4:
+            probe = self.tablebase.probe(board)
+            if probe is not None:
+                pvLine.clear()
+                result, plies = probe
+                return result * (MATE_SCORE - ply - plies) if result else 0
+        if leaf:
+            pvLine.clear()
+            return self._quiescence(ply, alpha, beta)
+
+        key = board.keyHistory[-1]
+        entry = self.table.probe(key)
+        tableMove = None
+        if entry is not None:
+            tableDepth, tableScore, bound, tableMove = entry
+            if ply > 0 and tableDepth >= depth:
+                score = _fromTableScore(tableScore, ply)
+                if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                    self._pvTable[ply] = [tableMove] if tableMove else []
+                    return score
+
+        color = self._getColor()
+        moves = board.generateLegalMoves(color)
+        if not moves:
+            pvLine.clear()
+            return -MATE_SCORE + ply if board.bitboards.isInCheck(color.value) else 0
+
+        originalAlpha = alpha
+        bestScore = -INFINITE
+        bestLine = None
+        for move in self._orderMoves(moves, ply, tableMove):
+            board.push(move)
+            score = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            board.pop()
+            if score > bestScore:
+                bestScore = score
+                bestLine = [move] + self._pvTable[ply + 1]
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self._pvTable[ply] = bestLine
+        bound = UPPER if bestScore <= originalAlpha else LOWER if bestScore >= beta else EXACT
+        self.table.store(key, depth, _toTableScore(bestScore, ply), bound, bestLine[0] if bound != UPPER else None)
+        return bestScore
+
+    def _quiescence(self, ply: int, alpha: int, beta: int) -> int:
+        # resolves captures (and promotions) at the leaves, captures losing material by static exchange are skipped;
+        # in check all evasions are searched, as standing pat is no option then
+        self.nodes += 1
+        self._checkLimits()
+        board = self.board
+        color = self._getColor()
+        inCheck = board.bitboards.isInCheck(color.value)
+        if ply >= MAX_PLY:
+            return evaluate(board)
+        if inCheck:
+            bestScore = -MATE_SCORE + ply
+        else:
+            bestScore = evaluate(board)             # stand pat
+            if bestScore >= beta:
+                return bestScore
+            alpha = max(alpha, bestScore)
+
+        moves = board.generateLegalMoves(color)
+        if not moves:
+            return bestScore if inCheck else 0
+        squares = board.squares
+        bitboards = board.bitboards
+        enPassantTarget = board._getEnPassantTarget(color)
+        candidates = []
+        for move in moves:
+            target = move.toLocation.index
+            if squares[target].isOccupied or move.promotion or (target == enPassantTarget and squares[move.fromLocation.index].currentPiece.name == "P"):
+                exchange = bitboards.staticExchange(move.fromLocation.index, target)
+                if exchange >= 0 or move.promotion or inCheck:
+                    candidates.append((exchange + (PIECE_VALUES[move.promotion] if move.promotion else 0), move))
+            elif inCheck:
+                candidates.append((-INFINITE, move))
+        candidates.sort(key=lambda candidate: -candidate[0])
+
+        for exchange, move in candidates:
+            board.push(move)
+            score = -self._quiescence(ply + 1, -beta, -alpha)
+            board.pop()
+            if score > bestScore:
+                bestScore = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return bestScore
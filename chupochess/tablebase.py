@@ -0,0 +1,236 @@
+import argparse
+import mmap
+import os
+import time
+from typing import Dict, List, Tuple
+from chupochess.board import Board
+from chupochess.common import PieceColor
+from chupochess.attacks import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, rookAttacks, bishopAttacks, queenAttacks
+
+# endgame tablebases for king + pieces against a lone king, generated by retrograde analysis:
+# one byte per position (0 = draw or illegal, n = mate in n - 1 plies: won if the strong side is to move,
+# lost if the lone king is to move), indexed directly -> a probe is a single read from the memory mapped file
+#
+# index: side to move (0 = strong side, 1 = lone king) | strong king | lone king | pieces (6 bits per square,
+# the strong side is always white in the tables, positions with a black strong side are mirrored)
+
+TABLES = {"KQK": ["Q"], "KRK": ["R"], "KPK": ["P"], "KBNK": ["B", "N"]}
+DEPENDENCIES = {"KPK": ["KQK", "KRK"]}          # promotions lead into these tables
+MAGIC = b"CHTB"
+HEADER_SIZE = 12                                # magic + table name (8 bytes, space padded)
+RANKS_1_AND_8 = 0xFF | (0xFF << 56)
+
+def _pieceAttacks(name: str, square: int, occupied: int) -> int:
+    if name == "Q":
+        return queenAttacks(square, occupied)
+    elif name == "R":
+        return rookAttacks(square, occupied)
+    elif name == "B":
+        return bishopAttacks(square, occupied)
+    elif name == "N":
+        return KNIGHT_ATTACKS[square]
+    return PAWN_ATTACKS[PieceColor.WHITE.value][square]
+
+def _whiteAttacks(names: List[str], squares: List[int], occupied: int) -> int:
+    # all squares attacked or defended by white (king on squares[0], pieces on squares[2:])
+    attacks = KING_ATTACKS[squares[0]]
+    for offset, name in enumerate(names):
+        attacks |= _pieceAttacks(name, squares[offset + 2], occupied)
+    return attacks
+
+def _decode(code: int, count: int) -> List[int]:
+    return [(code >> (6 * (count - 1 - offset))) & 63 for offset in range(count)]
+
+def _isLegal(names: List[str], squares: List[int]) -> bool:
+    # distinct squares, kings not next to each other, no pawns on the first and last rank
+    occupied = 0
+    for square in squares:
+        if occupied & (1 << square):
+            return False
+        occupied |= 1 << square
+    if KING_ATTACKS[squares[0]] & (1 << squares[1]):
+        return False
+    return all(not (name == "P" and (1 << squares[offset + 2]) & RANKS_1_AND_8) for offset, name in enumerate(names))
+
+def generate(name: str, dependencies: Dict[str, bytes] = None) -> bytearray:
+    # dependencies: values of the tables promotions lead into (see DEPENDENCIES)
+    names = TABLES[name]
+    count = len(names) + 2                          # pieces incl. both kings
+    bits = 6 * count
+    positions = 1 << bits                           # per side to move
+    values = bytearray(2 * positions)
+    counters = bytearray(positions)                 # legal moves of the lone king not yet known to lose
+    buckets = [[]]                                  # buckets[distance]: positions to resolve at that distance
+
+    # lone king to move: count its moves, mates are lost in 0; strong side to move: wins by promotion
+    for code in range(positions):
+        squares = _decode(code, count)
+        if not _isLegal(names, squares):
+            continue
+        loneKing = squares[1]
+        loneKingBit = 1 << loneKing
+        occupied = 0
+        for square in squares:
+            occupied |= 1 << square
+        attacks = _whiteAttacks(names, squares, occupied & ~loneKingBit)
+        inCheck = attacks & loneKingBit
+        moves = KING_ATTACKS[loneKing] & ~attacks           # incl. capturing undefended pieces -> draw
+        counters[code] = bin(moves).count("1")
+        if not moves and inCheck:
+            buckets[0].append(positions | code)
+        if not inCheck and dependencies:
+            for offset, piece in enumerate(names):
+                square = squares[offset + 2]
+                if piece != "P" or square < 48 or occupied & (1 << (square + 8)):
+                    continue
+                for promotion in ["Q", "R"]:
+                    target = "K" + promotion + "K"
+                    value = dependencies[target][(1 << 18) | (squares[0] << 12) | (loneKing << 6) | (square + 8)]
+                    if value:                       # lost for the lone king in value - 1 plies -> won in value plies
+                        while len(buckets) <= value:
+                            buckets.append([])
+                        buckets[value].append(code)
+
+    # retrograde analysis in order of increasing distance to mate
+    distance = 0
+    while distance < len(buckets):
+        following = buckets[distance + 1] if distance + 1 < len(buckets) else []
+        for index in buckets[distance]:
+            if values[index]:
+                continue
+            values[index] = distance + 1
+            code = index & (positions - 1)
+            squares = _decode(code, count)
+            occupied = 0
+            for square in squares:
+                occupied |= 1 << square
+            if index >= positions:
+                # lost for the lone king: every position where white can move into it is won
+                for offset in [0] + list(range(2, count)):
+                    square = squares[offset]
+                    shift = 6 * (count - 1 - offset)
+                    if offset == 0:
+                        origins = KING_ATTACKS[square] & ~occupied & ~KING_ATTACKS[squares[1]]
+                    elif names[offset - 2] == "P":
+                        origins = 0
+                        if square >= 16 and not occupied & (1 << (square - 8)):
+                            origins |= 1 << (square - 8)
+                            if 24 <= square < 32 and not occupied & (1 << (square - 16)):
+                                origins |= 1 << (square - 16)
+                    else:
+                        origins = _pieceAttacks(names[offset - 2], square, occupied) & ~occupied
+                    while origins:
+                        low = origins & -origins
+                        origins ^= low
+                        origin = low.bit_length() - 1
+                        predecessor = code + ((origin - square) << shift)
+                        if values[predecessor]:
+                            continue
+                        previous = squares.copy()
+                        previous[offset] = origin
+                        previousOccupied = (occupied & ~(1 << square)) | (1 << origin)
+                        if not _whiteAttacks(names, previous, previousOccupied) & (1 << squares[1]):
+                            following.append(predecessor)           # legal: lone king not in check
+            else:
+                # won for white: the lone king's moves into this position lose, all of them -> lost
+                loneKing = squares[1]
+                shift = 6 * (count - 2)
+                origins = KING_ATTACKS[loneKing] & ~occupied
+                while origins:
+                    low = origins & -origins
+                    origins ^= low
+                    predecessor = code + (((low.bit_length() - 1) - loneKing) << shift)
+                    if counters[predecessor] and not values[positions | predecessor]:
+                        counters[predecessor] -= 1
+                        if counters[predecessor] == 0:
+                            following.append(positions | predecessor)
+        if following and distance + 1 == len(buckets):
+            buckets.append(following)
+        distance += 1
+    return values
+
+def writeTable(path: str, name: str, values: bytes) -> None:
+    with open(path, "wb") as handle:
+        handle.write(MAGIC + name.encode().ljust(8))
+        handle.write(values)
+
+class Tablebase:
+    def __init__(self, directory: str) -> None:
+        # tables are opened on first use: <directory>/<name>.bin
+        self.directory = directory
+        self._tables = {}               # name -> (file, mmap) or None if not available
+        self._names = {"".join(sorted(pieces)): name for name, pieces in TABLES.items()}
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            if table:
+                table[1].close()
+                table[0].close()
+        self._tables.clear()
+
+    def _getTable(self, name: str) -> mmap.mmap:
+        if name not in self._tables:
+            path = os.path.join(self.directory, name + ".bin")
+            if not os.path.exists(path):
+                self._tables[name] = None
+            else:
+                handle = open(path, "rb")
+                memory = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                if memory[:HEADER_SIZE] != MAGIC + name.encode().ljust(8):
+                    memory.close()
+                    handle.close()
+                    raise ValueError("invalid tablebase file: " + path)
+                self._tables[name] = (handle, memory)
+        return self._tables[name][1] if self._tables[name] else None
+
+    def probe(self, board: Board) -> Tuple[int, int]:
+        # (result, plies to mate) for the side to move: 1 = won, 0 = draw, -1 = lost; None if not covered
+        if len(board.whitePieces) + len(board.blackPieces) > 4:
+            return None
+        if len(board.blackPieces) == 1:
+            strong, color = board.whitePieces, PieceColor.WHITE
+        elif len(board.whitePieces) == 1:
+            strong, color = board.blackPieces, PieceColor.BLACK
+        else:
+            return None
+        pieces = sorted((piece for piece in strong if piece.name != "K"), key=lambda piece: piece.name)
+        name = self._names.get("".join(piece.name for piece in pieces))
+        memory = self._getTable(name) if name else None
+        if memory is None:
+            return None
+        order = TABLES[name]
+        pieces.sort(key=lambda piece: order.index(piece.name))
+        mirror = 0 if color == PieceColor.WHITE else 56         # black strong side: flip the ranks
+        squares = [board.getKingLocation(color).index, board.getKingLocation(color.Not()).index] \
+            + [piece.currentSquare.location.index for piece in pieces]
+        index = 0 if (color == PieceColor.WHITE) == board.whiteToMove else 1
+        for square in squares:
+            index = (index << 6) | (square ^ mirror)
+        value = memory[HEADER_SIZE + index]
+        if value == 0:
+            return (0, 0)
+        return (1 if index >> (6 * len(squares)) == 0 else -1, value - 1)
+
+def main(args: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="generate endgame tablebases by retrograde analysis")
+    parser.add_argument("--directory", default="tablebases")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES.keys()), default=["KQK", "KRK", "KPK"])
+    options = parser.parse_args(args)
+    os.makedirs(options.directory, exist_ok=True)
+    generated = {}
+    # dependencies first
+    names = []
+    for name in options.tables:
+        for dependency in DEPENDENCIES.get(name, []) + [name]:
+            if dependency not in names:
+                names.append(dependency)
+    for name in names:
+        start = time.perf_counter()
+        dependencies = {dependency: generated[dependency] for dependency in DEPENDENCIES.get(name, [])}
+        generated[name] = generate(name, dependencies)
+        writeTable(os.path.join(options.directory, name + ".bin"), name, generated[name])
+        longest = max(generated[name]) - 1
+        print(name + ": longest mate " + str(longest) + " plies, " + "%.1f" % (time.perf_counter() - start) + "s")
+
+if __name__ == "__main__":
+    main()
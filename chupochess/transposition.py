@@ -0,0 +1,99 @@
+from array import array
+from typing import Tuple
+from chupochess.common import Move, LOCATIONS
+
+# fixed-size transposition table: two flat arrays of unsigned 64-bit integers (keys and packed entry data),
+# grouped into buckets of BUCKET_SIZE entries -> memory use is exactly 16 bytes per entry
+
+EXACT, LOWER, UPPER = 1, 2, 3           # bound of the stored score
+BUCKET_SIZE = 4
+ENTRY_SIZE = 16                         # bytes: 8 key + 8 data
+
+# data layout (bits): move 0-14 (from 6, to 6, promotion 3), score 15-34, depth 35-42, bound 43-44, age 45-50
+_SCORE_OFFSET = 1 << 19
+_PROMOTIONS = [None, "Q", "R", "B", "N"]
+_PROMOTION_CODES = {name: code for code, name in enumerate(_PROMOTIONS)}
+
+def encodeMove(move: Move) -> int:
+    if move is None:
+        return 0
+    return move.fromLocation.index | (move.toLocation.index << 6) | (_PROMOTION_CODES[move.promotion] << 12)
+
+def decodeMove(code: int) -> Move:
+    if code == 0:
+        return None
+    return Move(LOCATIONS[code & 63], LOCATIONS[(code >> 6) & 63], _PROMOTIONS[code >> 12])
+
+def getTableBytes(sizeMB: float) -> int:
+    # memory needed by a table of the given size (see TranspositionTable, 'buffer')
+    return max(1, int(sizeMB * 1024 * 1024) // (ENTRY_SIZE * BUCKET_SIZE)) * BUCKET_SIZE * ENTRY_SIZE
+
+class TranspositionTable:
+    def __init__(self, sizeMB: float = 16, buffer: object = None) -> None:
+        # buffer: optional writable memory of getTableBytes(sizeMB) bytes the table lives in, e.g. the 'buf' of
+        # a multiprocessing.shared_memory.SharedMemory to share the table between processes
+        self.buckets = getTableBytes(sizeMB) // (ENTRY_SIZE * BUCKET_SIZE)
+        self.size = self.buckets * BUCKET_SIZE
+        # the key is stored xor-ed with the data, so an entry only matches if key and data belong together;
+        # this also makes the table safe without locks: an entry torn by concurrent writers never verifies
+        if buffer is None:
+            self.keys = array("Q", bytes(8 * self.size))
+            self.data = array("Q", bytes(8 * self.size))    # 0 = empty slot
+        else:
+            view = memoryview(buffer).cast("B")[:self.size * ENTRY_SIZE].cast("Q")
+            self.keys = view[:self.size]
+            self.data = view[self.size:]
+        self.age = 0
+
+    def release(self) -> None:
+        # gives up the views of an external 'buffer' so its memory can be closed, the table is unusable afterwards
+        if isinstance(self.keys, memoryview):
+            self.keys.release()
+            self.data.release()
+
+    def newSearch(self) -> None:
+        # entries of older searches are replaced first
+        self.age = (self.age + 1) & 63
+
+    def clear(self) -> None:
+        self.keys[:] = array("Q", bytes(8 * self.size))
+        self.data[:] = array("Q", bytes(8 * self.size))
+        self.age = 0
+
+    def probe(self, key: int) -> Tuple[int, int, int, Move]:
+        # returns (depth, score, bound, best move) or None
+        keys, data = self.keys, self.data
+        start = (key % self.buckets) * BUCKET_SIZE
+        for index in range(start, start + BUCKET_SIZE):
+            entry = data[index]
+            if entry and keys[index] ^ entry == key:
+                return ((entry >> 35) & 255, ((entry >> 15) & 0xFFFFF) - _SCORE_OFFSET, (entry >> 43) & 3, decodeMove(entry & 0x7FFF))
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: Move = None) -> None:
+        keys, data = self.keys, self.data
+        start = (key % self.buckets) * BUCKET_SIZE
+        # same position, else an empty slot, else the entry with the lowest depth (older searches count less)
+        replace = start
+        replaceValue = None
+        for index in range(start, start + BUCKET_SIZE):
+            entry = data[index]
+            if not entry:
+                replace = index
+                break
+            if keys[index] ^ entry == key:
+                replace = index
+                if move is None:
+                    move = decodeMove(entry & 0x7FFF)       # keep the best move of the earlier search
+                break
+            value = ((entry >> 35) & 255) - 8 * ((self.age - (entry >> 45)) & 63)
+            if replaceValue is None or value < replaceValue:
+                replace, replaceValue = index, value
+        entry = encodeMove(move) | ((score + _SCORE_OFFSET) << 15) | (min(depth, 255) << 35) | (bound << 43) | (self.age << 45)
+        data[replace] = entry
+        keys[replace] = key ^ entry
+
+    def hashfull(self) -> int:
+        # permille of used entries (sampled from the first 1000 entries, as usual in UCI)
+        sample = min(1000, self.size)
+        return sum(1 for index in range(sample) if self.data[index] and (self.data[index] >> 45) == self.age) * 1000 // sample
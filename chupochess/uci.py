@@ -0,0 +1,213 @@
+import sys
+import threading
+from typing import Callable, List
+from chupochess.board import Board
+from chupochess.common import Move
+from chupochess.search import Search, SearchResult, MATE_SCORE, isMateScore
+from chupochess.parallel import ParallelSearch
+from chupochess.transposition import TranspositionTable
+from chupochess.polyglot import PolyglotBook
+from chupochess.tablebase import Tablebase
+
+# UCI protocol front end: python -m chupochess.uci
+# the search runs in a background thread, so 'stop' and 'isready' are answered while searching
+
+MOVE_OVERHEAD = 0.05            # seconds kept in reserve per move for communication
+
+class UCIEngine:
+    def __init__(self, output: Callable[[str], None] = None) -> None:
+        self.output = output if output is not None else self._print
+        self.board = Board()
+        self.hashMB = 16
+        self.threads = 1
+        self.table = TranspositionTable(self.hashMB)
+        self._parallel = None           # ParallelSearch with Threads > 1, its shared table is then self.table
+        self.book = None                # PolyglotBook, moves found in the book are played without searching
+        self.tablebase = None           # Tablebase, endgames with up to 4 pieces are looked up (single thread only)
+        self._search = None             # Search or ParallelSearch of the running search
+        self._thread = None
+        self._stopRequested = threading.Event()     # 'go infinite' only reports its best move after 'stop'
+        self._outputLock = threading.Lock()
+
+    def _print(self, line: str) -> None:
+        print(line, flush=True)
+
+    def send(self, line: str) -> None:
+        with self._outputLock:
+            self.output(line)
+
+    def handle(self, line: str) -> bool:
+        # processes one command, returns False after 'quit'
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send("id name ChupoChess")
+            self.send("id author kai468")
+            self.send("option name Hash type spin default 16 min 1 max 4096")
+            self.send("option name Threads type spin default 1 min 1 max 256")
+            self.send("option name BookFile type string default <empty>")
+            self.send("option name TablebasePath type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "stop":
+            self.waitForSearch(stop=True)
+        elif command == "quit":
+            self.waitForSearch(stop=True)
+            self.close()
+            return False
+        elif command in ["ucinewgame", "setoption", "position", "go"]:
+            # a running search is ended first: its thread can't wait for a 'stop' that has to be read by this one
+            self.waitForSearch(stop=True)
+            try:
+                if command == "ucinewgame":
+                    self.table.clear()
+                    self.board = Board()
+                elif command == "setoption":
+                    self._setOption(arguments)
+                elif command == "position":
+                    self._setPosition(arguments)
+                else:
+                    self._go(arguments)
+            except (ValueError, OSError) as error:
+                self.send("info string ignored '" + line.strip() + "': " + str(error))
+        return True
+
+    def close(self) -> None:
+        # releases the shared table of the parallel search and the open files
+        if self._parallel:
+            self._parallel.close()
+            self._parallel = None
+        if self.book:
+            self.book.close()
+            self.book = None
+        if self.tablebase:
+            self.tablebase.close()
+            self.tablebase = None
+
+    def _createTable(self) -> None:
+        # one table per Hash/Threads setting, kept from move to move
+        if self._parallel:
+            self._parallel.close()
+            self._parallel = None
+        if self.threads > 1:
+            self._parallel = ParallelSearch(self.board, self.threads, self.hashMB, self.tablebase)
+            self.table = self._parallel.table
+        else:
+            self.table = TranspositionTable(self.hashMB)
+
+    def _setOption(self, arguments: List[str]) -> None:
+        # setoption name <name> value <value>
+        if "name" not in arguments or "value" not in arguments:
+            return
+        name = " ".join(arguments[arguments.index("name") + 1:arguments.index("value")]).lower()
+        value = " ".join(arguments[arguments.index("value") + 1:])
+        if name == "hash":
+            self.hashMB = max(1, int(value))
+            self._createTable()
+        elif name == "threads":
+            self.threads = max(1, int(value))
+            self._createTable()
+        elif name == "bookfile":
+            book = PolyglotBook(value) if value and value != "<empty>" else None
+            if self.book:
+                self.book.close()
+            self.book = book
+        elif name == "tablebasepath":
+            if self.tablebase:
+                self.tablebase.close()
+            self.tablebase = Tablebase(value) if value and value != "<empty>" else None
+            if self._parallel:
+                self._parallel.tablebase = self.tablebase
+
+    def _setPosition(self, arguments: List[str]) -> None:
+        # position startpos [moves ...] | position fen <fen> [moves ...]
+        moves = arguments.index("moves") if "moves" in arguments else len(arguments)
+        if arguments and arguments[0] == "fen":
+            board = Board.fromFEN(" ".join(arguments[1:moves]))
+        else:
+            board = Board()
+        for move in arguments[moves + 1:]:
+            try:
+                legal = Move.fromString(move) in board.getLegalMoves()
+            except (ValueError, KeyError, IndexError):
+                legal = False
+            if not legal:
+                raise ValueError("illegal move " + move)
+            board.push(Move.fromString(move))
+        self.board = board
+
+    def _getMovetime(self, options: dict) -> float:
+        # time for this move in seconds from 'movetime' or the clock (wtime/btime, winc/binc, movestogo)
+        if "movetime" in options:
+            return max(0.0, options["movetime"] / 1000 - MOVE_OVERHEAD)
+        remaining = options.get("wtime" if self.board.whiteToMove else "btime")
+        if remaining is None:
+            return None
+        increment = options.get("winc" if self.board.whiteToMove else "binc", 0)
+        movesToGo = options.get("movestogo", 30)
+        budget = remaining / max(1, movesToGo) + increment * 0.8
+        return max(0.01, min(budget, remaining / 2) / 1000 - MOVE_OVERHEAD)
+
+    def _go(self, arguments: List[str]) -> None:
+        options = {}
+        for index, argument in enumerate(arguments):
+            if argument in ["depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo"] and index + 1 < len(arguments):
+                options[argument] = int(arguments[index + 1])
+        depth = options.get("depth")
+        nodes = options.get("nodes")
+        infinite = "infinite" in arguments
+        bookMove = self.book.getMove(self.board) if self.book and not infinite else None
+        if bookMove:
+            self.send("bestmove " + str(bookMove).lower())
+            return
+        movetime = None if infinite else self._getMovetime(options)
+        self._stopRequested.clear()
+        if self._parallel:
+            self._parallel.board = self.board
+            self._search = self._parallel
+        else:
+            self._search = Search(self.board, self.table, tablebase=self.tablebase)
+        self._thread = threading.Thread(target=self._runSearch, args=(self._search, depth, nodes, movetime, infinite), daemon=True)
+        self._thread.start()
+
+    def _runSearch(self, search: object, depth: int, nodes: int, movetime: float, infinite: bool) -> None:
+        result = search.search(depth, nodes, movetime, self._sendInfo)
+        if infinite:
+            self._stopRequested.wait()
+        self.send("bestmove " + (str(result.bestMove).lower() if result.bestMove else "0000"))
+
+    def _sendInfo(self, result: SearchResult) -> None:
+        if isMateScore(result.score):
+            plies = MATE_SCORE - abs(result.score)
+            score = "mate " + str((plies + 1) // 2 if result.score > 0 else -((plies + 1) // 2))
+        else:
+            score = "cp " + str(result.score)
+        self.send("info depth " + str(result.depth) + " score " + score + " nodes " + str(result.nodes)
+                  + " nps " + str(result.nps) + " time " + str(int(result.time * 1000))
+                  + " pv " + " ".join(str(move).lower() for move in result.pv))
+
+    def waitForSearch(self, stop: bool = False) -> None:
+        # waits until the running search (if any) has sent its best move
+        if self._thread is None:
+            return
+        if stop:
+            if self._thread.is_alive():
+                self._search.stop()     # only a running search, the stop would be left over for the next one
+            self._stopRequested.set()
+        self._thread.join()
+        self._thread = None
+        self._search = None
+
+def main() -> None:
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.waitForSearch(stop=True)
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import random
+from chupochess.common import PieceColor
+
+# 64-bit random keys for Zobrist hashing, fixed seed -> keys are stable between runs and processes
+_random = random.Random(0x43485550)
+
+# PIECE_KEYS[color.value][piece name][square index]
+PIECE_KEYS = [{name: [_random.getrandbits(64) for _ in range(64)] for name in ["P", "N", "B", "R", "Q", "K"]} for _ in PieceColor]
+SIDE_KEY = _random.getrandbits(64)                                  # included if black is to move
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]        # indexed by castling rights mask (see castlingMask)
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]       # indexed by file
+
+def castlingMask(rights: tuple) -> int:
+    # rights: (white kingside, white queenside, black kingside, black queenside)
+    mask = 0
+    for bit, right in enumerate(rights):
+        if right:
+            mask |= 1 << bit
+    return mask
+
+def computeKey(board: object) -> int:
+    # full recomputation from the squares, Board maintains the same key incrementally (see Board.zobristKey)
+    key = 0
+    for square in board.squares:
+        if square.isOccupied:
+            key ^= PIECE_KEYS[square.currentPiece.color.value][square.currentPiece.name][square.location.index]
+    if not board.whiteToMove:
+        key ^= SIDE_KEY
+    key ^= CASTLING_KEYS[castlingMask(board._getCastlingRights(PieceColor.WHITE) + board._getCastlingRights(PieceColor.BLACK))]
+    enPassantFile = board._getEnPassantFile()
+    if enPassantFile is not None:
+        key ^= EN_PASSANT_KEYS[enPassantFile]
+    return key
@@ -544,4 +544,823 @@ def test_Piece_getGlobalValidMoves():
     makeMove("F1", "B5")
     assert len(board.blackPieces) == 14
     assert blackPossibleMoves() == 7
-    
\ No newline at end of file
+
+def test_Board_mailbox():
+    from chupochess.board import Board
+    from chupochess.common import Location, File
+    board = Board()
+    assert len(board.squares) == 64
+    assert Location(0, File.A).index == 0
+    assert Location(7, File.H).index == 63
+    assert hash(Location(3, File.C)) == hash(Location(3, File.C))
+    for square in board.squares:
+        assert board.squares[square.location.index] is square
+        assert board.locationSquareMap[square.location] is square
+        assert board.getSquare(square.location) is square
+    assert len(board.locationSquareMap) == 64
+    assert Location(8, File.A) not in board.locationSquareMap
+    assert Location(-1, File.H) not in board.locationSquareMap
+    assert None not in board.locationSquareMap
+    assert board.getSquare(Location(0, File.E)).currentPiece.name == "K"
+
+def test_Board_bitboardBackend():
+    from chupochess.board import Board
+    from chupochess.common import Location, File, BoardBackend, GameState, PieceColor
+    objects = Board()
+    bitboards = Board(BoardBackend.BITBOARD)
+    files = [file.name for file in File]
+    def makeMove(sFrom: str, sTo: str) -> None:
+        # input format: sFrom/sTo = "A8"
+        for board in [objects, bitboards]:
+            fromSquare = board.locationSquareMap[Location(int(sFrom[1]) - 1, File(files.index(sFrom[0])))]
+            toSquare = board.locationSquareMap[Location(int(sTo[1]) - 1, File(files.index(sTo[0])))]
+            fromSquare.currentPiece.makeMove(toSquare, board)
+    def assertSameMoves() -> None:
+        for piece in objects.whitePieces + objects.blackPieces:
+            location = piece.currentSquare.location
+            assert set(map(str, bitboards.getValidMoves(location))) == set(map(str, objects.getValidMoves(location)))
+        for color in PieceColor:
+            assert set(map(str, bitboards.isInCheck(color))) == set(map(str, objects.isInCheck(color)))
+
+    assertSameMoves()
+    for move in [("H2", "H3"), ("E7","E6"), ("B1", "A3"), ("F8", "C5"), ("D2", "D4"), ("G8", "F6"), ("D4", "C5")]:
+        makeMove(move[0], move[1])
+        assertSameMoves()
+    # en passant and castling:
+    for move in [("E2", "E4"), ("C7", "C6"), ("E4", "E5"), ("D7", "D5"), ("F1", "E2"), ("E8", "G8")]:
+        makeMove(move[0], move[1])
+        assertSameMoves()
+    # scholar's mate:
+    objects = Board()
+    bitboards = Board(BoardBackend.BITBOARD)
+    for move in [("E2", "E4"), ("E7", "E5"), ("F1", "C4"), ("B8", "C6"), ("D1", "H5"), ("G8", "F6"), ("H5", "F7")]:
+        makeMove(move[0], move[1])
+        assertSameMoves()
+    objects.updateGameState()
+    bitboards.updateGameState()
+    assert objects.gameState == bitboards.gameState == GameState.WHITE_WINS
+
+def test_attacks_nonSlidingTables():
+    from chupochess.attacks import KNIGHT_TARGETS, KING_TARGETS, PAWN_TARGETS, KNIGHT_ATTACKS
+    from chupochess.common import Location, File, PieceColor
+    assert sorted(KNIGHT_TARGETS[Location(0, File.A).index]) == sorted([Location(1, File.C).index, Location(2, File.B).index])
+    assert len(KNIGHT_TARGETS[Location(3, File.D).index]) == 8
+    assert KNIGHT_ATTACKS[0] == (1 << Location(1, File.C).index) | (1 << Location(2, File.B).index)
+    assert len(KING_TARGETS[Location(7, File.H).index]) == 3
+    assert len(KING_TARGETS[Location(4, File.E).index]) == 8
+    assert PAWN_TARGETS[PieceColor.WHITE.value][Location(1, File.A).index] == (Location(2, File.B).index,)
+    assert sorted(PAWN_TARGETS[PieceColor.BLACK.value][Location(6, File.E).index]) == [Location(5, File.D).index, Location(5, File.F).index]
+
+def test_King_notNextToOpponentKing():
+    from chupochess.board import Board
+    from chupochess.common import Location, File
+    board = Board()
+    board.getSquare(Location(0, File.E)).currentPiece.makeMove(board.getSquare(Location(5, File.E)), board)
+    wKing = board.getSquare(Location(5, File.E)).currentPiece
+    board.getSquare(Location(7, File.E)).currentPiece.makeMove(board.getSquare(Location(3, File.E)), board)
+    # kings on E6 and E4, E5 is next to both:
+    assert Location(4, File.E) not in wKing.getValidMoves(board)
+
+def test_attacks_slidingLookup():
+    from chupochess.attacks import RAYS, bishopAttacks, rookAttacks, queenAttacks, BETWEEN, LINES, iterBits
+    from chupochess.common import Location, File
+    import random
+    def slowAttacks(index: int, occupied: int, directions: list) -> int:
+        attacks = 0
+        for direction in directions:
+            for target in RAYS[direction][index]:
+                attacks |= 1 << target
+                if occupied & (1 << target):
+                    break
+        return attacks
+    rng = random.Random(4)
+    for _ in range(500):
+        occupied = rng.getrandbits(64) & rng.getrandbits(64)
+        index = rng.randrange(64)
+        assert rookAttacks(index, occupied) == slowAttacks(index, occupied, [0, 1, 2, 3])
+        assert bishopAttacks(index, occupied) == slowAttacks(index, occupied, [4, 5, 6, 7])
+        assert queenAttacks(index, occupied) == slowAttacks(index, occupied, range(8))
+    a1, d4, h8 = Location(0, File.A).index, Location(3, File.D).index, Location(7, File.H).index
+    assert sorted(iterBits(BETWEEN[a1][d4])) == [Location(1, File.B).index, Location(2, File.C).index]
+    assert LINES[a1][d4] == LINES[d4][h8]
+    assert BETWEEN[a1][Location(1, File.C).index] == 0 and LINES[a1][Location(1, File.C).index] == 0
+
+def test_Location_interned():
+    import pickle
+    import pytest
+    from chupochess.common import Location, LocationFactory, File, LOCATIONS
+    location = Location(3, File.C)
+    assert location is Location(3, File.C)
+    assert location is LOCATIONS[location.index]
+    assert LocationFactory.build(location, 1, 1) is Location(4, File.D)
+    assert LocationFactory.build(location, 0, 5) == None
+    assert LocationFactory.build(location, -3, 0) == None
+    assert pickle.loads(pickle.dumps(location)) is location
+    with pytest.raises(AttributeError):
+        location.rank = 4
+    with pytest.raises(AttributeError):
+        location.somethingElse = 4
+    assert Location(8, File.A) == Location(8, File.A)
+    assert Location(8, File.A) not in LOCATIONS
+
+def test_Board_generateLegalMoves():
+    from chupochess.board import Board
+    from chupochess.common import Location, File, PieceColor, Move
+    board = Board()
+    files = [file.name for file in File]
+    def makeMove(sFrom: str, sTo: str) -> None:
+        # input format: sFrom/sTo = "A8"
+        fromSquare = board.locationSquareMap[Location(int(sFrom[1]) - 1, File(files.index(sFrom[0])))]
+        toSquare = board.locationSquareMap[Location(int(sTo[1]) - 1, File(files.index(sTo[0])))]
+        fromSquare.currentPiece.makeMove(toSquare, board)
+    def perPieceMoves(color: PieceColor) -> set:
+        moves = set()
+        for piece in board.getPieceList(color):
+            moves |= {Move(piece.currentSquare.location, move) for move in piece.getValidMoves(board)}
+        return moves
+
+    assert len(board.generateLegalMoves(PieceColor.WHITE)) == 20
+    assert len(board.generateLegalMoves(PieceColor.BLACK)) == 20
+    prepMoves = [("E2","E4"), ("F7","F5"), ("E4", "F5"),("E7","E5"),("F5", "E6"), ("D7", "E6")]
+    for move in prepMoves:
+        makeMove(move[0], move[1])
+    assert set(board.generateLegalMoves(PieceColor.BLACK)) == perPieceMoves(PieceColor.BLACK)
+    assert len(board.generateLegalMoves(PieceColor.BLACK)) == 36
+    makeMove("F1", "B5")        # check
+    assert set(board.generateLegalMoves(PieceColor.BLACK)) == perPieceMoves(PieceColor.BLACK)
+    assert len(board.generateLegalMoves(PieceColor.BLACK)) == 7
+    # promotions are generated for every piece type:
+    makeMove("A2", "A7")
+    makeMove("C7", "C6")
+    moves = [move for move in board.generateLegalMoves(PieceColor.WHITE) if move.fromLocation == Location(6, File.A)]
+    assert sorted(move.promotion for move in moves if move.toLocation == Location(7, File.B)) == ["B", "N", "Q", "R"]
+
+def test_Board_pushPop():
+    import random
+    from chupochess.board import Board
+    from chupochess.common import PieceColor, Move, Location, File
+    def signature(board: Board) -> tuple:
+        squares = tuple((square.currentPiece.name, square.currentPiece.color, getattr(square.currentPiece, "isFirstMove", None))
+            if square.isOccupied else None for square in board.squares)
+        for square in board.squares:
+            if square.isOccupied:
+                assert square.currentPiece.currentSquare is square
+        return (squares, board.whiteToMove, tuple(pawn.currentSquare.location for pawn in board.enPassantPossible),
+            board.whiteKingLocation, board.blackKingLocation, tuple(board.whitePieces), tuple(board.blackPieces),
+            tuple(board.bitboards.pieces[0]), tuple(board.bitboards.pieces[1]), board.bitboards.occupied)
+
+    rng = random.Random(7)
+    for game in range(4):
+        board = Board()
+        signatures = []
+        for ply in range(120):
+            moves = board.generateLegalMoves(PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK)
+            if not moves:
+                break
+            signatures.append(signature(board))
+            board.push(rng.choice(moves))
+        while board.moveStack:
+            board.pop()
+            assert signature(board) == signatures.pop()
+
+    # castling, en passant and under-promotion:
+    board = Board()
+    start = signature(board)
+    for move in ["G1F3", "B8C6", "E2E4", "C6D4", "E4E5", "D7D5", "E5D6", "D4E2", "F1E2", "G8F6", "E1G1", "E7D6",
+                 "A2A4", "B7B5", "A4B5", "A7A6", "B5A6", "H7H6", "A6A7", "A8B8", "A7B8N"]:
+        move = Move(Location(int(move[1]) - 1, File[move[0]]), Location(int(move[3]) - 1, File[move[2]]), move[4:] or None)
+        assert move in board.generateLegalMoves(PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK)
+        board.push(move)
+        if str(move) == "E1G1":
+            assert board.getSquare(Location(0, File.G)).currentPiece.name == "K"
+            assert board.getSquare(Location(0, File.F)).currentPiece.name == "R"
+    assert board.getSquare(Location(7, File.B)).currentPiece.name == "N"
+    assert board.getSquare(Location(7, File.B)).currentPiece.color == PieceColor.WHITE
+    while board.moveStack:
+        board.pop()
+    assert signature(board) == start
+
+def test_perft():
+    from chupochess.perft import POSITIONS, perft, divide, getPosition
+    for name, (fen, expected) in POSITIONS.items():
+        board = getPosition(name)
+        for depth in range(1, 4):
+            assert perft(board, depth) == expected[depth - 1]
+    counts = divide(getPosition("start"), 2)
+    assert len(counts) == 20
+    assert counts["E2E4"] == 20
+    assert sum(counts.values()) == 400
+
+def test_Board_zobristKey():
+    import random
+    from chupochess.board import Board
+    from chupochess.common import Move, PieceColor
+    from chupochess.zobrist import computeKey
+    board = Board()
+    startKey = board.zobristKey
+    assert startKey == computeKey(board)
+    # transpositions lead to the same key, the side to move matters:
+    for move in ["G1F3", "G8F6", "F3G1", "F6G8"]:
+        board.push(Move.fromString(move))
+    assert board.zobristKey == startKey
+    board.push(Move.fromString("G1F3"))
+    afterNf3 = board.zobristKey
+    board.whiteToMove = True
+    assert board.zobristKey != afterNf3
+    board.whiteToMove = False
+    assert board.zobristKey == afterNf3
+    # castling rights and en passant are part of the key:
+    other = Board()
+    for move in ["G1F3", "G8F6", "H1G1", "H8G8", "G1H1", "G8H8"]:
+        other.push(Move.fromString(move))
+    assert other.zobristKey != startKey
+    other = Board()
+    for move in ["E2E4", "A7A6", "E4E5", "D7D5"]:
+        other.push(Move.fromString(move))
+    withEnPassant = other.zobristKey
+    assert withEnPassant == computeKey(other)
+    other.enPassantPossible.clear()
+    assert other.zobristKey != withEnPassant
+    # incremental updates match a full recomputation:
+    rng = random.Random(9)
+    board = Board()
+    keys = []
+    for ply in range(100):
+        moves = board.generateLegalMoves(PieceColor.WHITE if board.whiteToMove else PieceColor.BLACK)
+        if not moves:
+            break
+        keys.append(board.zobristKey)
+        board.push(rng.choice(moves))
+        assert board.zobristKey == computeKey(board)
+    while board.moveStack:
+        board.pop()
+        assert board.zobristKey == keys.pop()
+
+def test_Board_repetitionAndFiftyMoveRule():
+    from chupochess.board import Board
+    from chupochess.common import Move, GameState
+    board = Board()
+    shuffle = ["G1F3", "G8F6", "F3G1", "F6G8"]
+    assert board.getRepetitionCount() == 1
+    for move in shuffle:
+        board.push(Move.fromString(move))
+    assert board.getRepetitionCount() == 2
+    assert board.halfmoveClock == 4
+    for move in shuffle:
+        board.push(Move.fromString(move))
+    assert board.getRepetitionCount() == 3
+    assert board.canClaimDraw()
+    board.updateGameState()
+    assert board.gameState == GameState.RUNNING          # threefold repetition has to be claimed
+    for move in shuffle * 2:
+        board.push(Move.fromString(move))
+    assert board.getRepetitionCount() == 5
+    board.updateGameState()
+    assert board.gameState == GameState.DRAW             # fivefold repetition
+    for _ in range(8):
+        board.pop()
+    assert board.getRepetitionCount() == 3
+    assert board.gameState == GameState.RUNNING
+    assert board.claimDraw()
+    assert board.gameState == GameState.DRAW
+
+    board = Board()
+    board.push(Move.fromString("G1F3"))
+    assert board.halfmoveClock == 1
+    board.push(Move.fromString("E7E5"))
+    assert board.halfmoveClock == 0
+    board.push(Move.fromString("F3E5"))
+    assert board.halfmoveClock == 0
+    board.push(Move.fromString("D8G5"))
+    assert board.halfmoveClock == 1
+    assert not board.canClaimDraw()
+    board.halfmoveClock = 99
+    board.push(Move.fromString("E5F3"))
+    assert board.canClaimDraw()
+    board.updateGameState()
+    assert board.gameState == GameState.RUNNING
+    board.halfmoveClock = 149
+    board.push(Move.fromString("G5H5"))
+    board.updateGameState()
+    assert board.gameState == GameState.DRAW             # seventy-five-move rule
+    board.pop()
+    assert board.halfmoveClock == 149
+
+def test_Board_fen():
+    import pytest
+    from chupochess.board import Board
+    from chupochess.common import Move, PieceColor, Location, File, BoardBackend
+    start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    assert Board().toFEN() == start
+    assert Board.fromFEN(start).zobristKey == Board().zobristKey
+    # round trip incl. castling rights, en passant square and clocks:
+    for fen in ["r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3",
+                "r3k2r/8/8/8/8/8/8/R3K2R b Kq - 5 40",
+                "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"]:
+        assert Board.fromFEN(fen).toFEN() == fen
+        assert Board.fromFEN(fen, BoardBackend.BITBOARD).toFEN() == fen
+    # moves update the clocks:
+    board = Board()
+    board.push(Move.fromString("G1F3"))
+    board.push(Move.fromString("E7E5"))
+    assert board.toFEN() == "rnbqkbnr/pppp1ppp/8/4p3/8/5N2/PPPPPPPP/RNBQKB1R w KQkq e6 0 2"
+    board.pop()
+    assert board.toFEN() == "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b KQkq - 1 1"
+    # castling rights and en passant are playable:
+    board = Board.fromFEN("r3k2r/8/8/8/8/8/8/R3K2R w Qk - 0 1")
+    moves = board.generateLegalMoves(PieceColor.WHITE)
+    assert Move.fromString("E1C1") in moves and Move.fromString("E1G1") not in moves
+    board = Board.fromFEN("rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3")
+    assert Move.fromString("E5D6") in board.generateLegalMoves(PieceColor.WHITE)
+    assert board.whiteKingLocation == Location(0, File.E)
+    # a pawn capture onto the file of the en passant pawn is no en passant capture:
+    board = Board.fromFEN("4k3/8/8/3p4/3n4/4P3/8/4K3 w - d6 0 1")
+    board.push(Move.fromString("E3D4"))
+    assert board.toFEN() == "4k3/8/8/3p4/3P4/8/8/4K3 b - - 0 1"
+    with pytest.raises(ValueError):
+        Board.fromFEN("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1")
+    with pytest.raises(ValueError):
+        Board.fromFEN("rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    for fen in ["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w XYZ - 0 1",           # castling field
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KKq - 0 1",
+                "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq z6 0 3",     # en passant field
+                "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d 0 3",
+                "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d9 0 3",
+                "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d3 0 3",     # wrong rank for the side to move
+                "rnbqkbnr/1pp1pppp/p7/3PP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3",     # pawn of the side to move
+                "rnbqkbnr/1pp1pppp/p2n4/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3",   # target square occupied
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1",         # clocks
+                "rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQ - 0 1",           # kings
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKKNR w kq - 0 1"]:
+        with pytest.raises(ValueError, match="invalid FEN"):
+            Board.fromFEN(fen)
+
+def test_pgn_readWrite():
+    import io
+    import pytest
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.pgn import readGames, writeGame, PGNGame, parseSAN, toSAN
+    text = """[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 {a comment
+spanning lines} Nc6 (2... Nf6 3. d3) 3. Qh5 $2 Nf6 ; rest of the line
+4. Qxf7# 1-0
+
+[Event "Promotion"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+
+1. a8=Q+ Kd7 *
+"""
+    games = list(readGames(io.StringIO(text)))
+    assert len(games) == 2
+    assert games[0].headers["White"] == "A" and games[0].result == "1-0"
+    assert games[0].moves == ["e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6", "Qxf7#"]
+    assert games[1].result == "*"
+    assert games[1].replay().toFEN() == "Q7/3k4/8/8/8/8/8/4K3 w - - 1 2"
+    # writing and reading again gives the same games:
+    board = games[0].replay()
+    output = io.StringIO()
+    writeGame(output, PGNGame.fromBoard(board, games[0].headers))
+    writeGame(output, games[1])
+    assert "4. Qxf7# 1-0" in output.getvalue()
+    assert [game.moves for game in readGames(io.StringIO(output.getvalue()))] == [game.moves for game in games]
+    assert len(board.moveStack) == 7
+    # SAN resolution incl. disambiguation and castling:
+    board = Board.fromFEN("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert parseSAN(board, "O-O") == Move.fromString("E1G1")
+    assert parseSAN(board, "Rad1") == Move.fromString("A1D1")
+    assert toSAN(board, Move.fromString("H1H8")) == "Rxh8+"
+    assert toSAN(board, Move.fromString("E1C1")) == "O-O-O"
+    board = Board.fromFEN("4k3/8/8/8/8/8/8/N3K2N w - - 0 1")
+    assert toSAN(board, Move.fromString("A1B3")) == "Nb3"
+    board = Board.fromFEN("4k3/8/8/8/8/2N1N3/8/4K3 w - - 0 1")
+    assert toSAN(board, Move.fromString("C3D5")) == "Ncd5"
+    for san in ["Nd5", "e5", "Qd2", "xyz"]:
+        with pytest.raises(ValueError):
+            parseSAN(board, san)
+
+def test_replay_bulkStatistics():
+    import io
+    from chupochess.pgn import readGames
+    from chupochess.replay import replayGames
+    text = """[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+
+[Result "0-1"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 d6 4. Qxf7# 1-0
+"""
+    for processes in [1, 2]:
+        stats = replayGames(readGames(io.StringIO(text * 3)), processes, batchSize=2, openingPlies=4)
+        assert stats.games == 12
+        assert stats.results == {"1-0": 6, "0-1": 3, "*": 3}
+        assert stats.lengths == {7: 6, 4: 3, 2: 3}
+        assert stats.openings["e4 e5 Bc4 Nc6"] == 6
+        assert sorted(stats.illegalMoves) == [(3, 3, "Ke3", "illegal move: Ke3"), (7, 3, "Ke3", "illegal move: Ke3"), (11, 3, "Ke3", "illegal move: Ke3")]
+
+def test_search_alphaBeta():
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.search import Search, MATE_SCORE
+    # mate in one (back rank), the board is unchanged afterwards:
+    fen = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+    board = Board.fromFEN(fen)
+    depths = []
+    result = Search(board).search(depth=4, callback=lambda info: depths.append(info.depth))
+    assert result.bestMove == Move.fromString("A1A8")
+    assert result.score == MATE_SCORE - 1
+    assert depths == [1]                        # stops after the forced mate is found
+    assert board.toFEN() == fen and len(board.moveStack) == 0
+    # winning material, principal variation starts with the best move:
+    board = Board.fromFEN("4k3/8/8/3q4/8/8/3R4/3K4 w - - 0 1")
+    result = Search(board).search(depth=2)
+    assert result.bestMove == Move.fromString("D2D5") and result.pv[0] == result.bestMove
+    assert 400 < result.score < 600 and result.depth == 2       # a rook up, plus piece-square terms
+    assert result.nodes > 0 and result.nps > 0
+    # stalemate is a draw, being mated the worst score:
+    assert Search(Board.fromFEN("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")).search(depth=2).score == 0
+    assert Search(Board.fromFEN("R6k/6pp/8/8/8/8/8/6K1 b - - 0 1")).search(depth=2).score == -MATE_SCORE
+    # node and time limits:
+    board = Board()
+    result = Search(board).search(nodes=500)
+    assert result.nodes == 500 and result.bestMove is not None
+    assert len(board.moveStack) == 0 and board.toFEN() == Board().toFEN()
+    result = Search(board).search(movetime=0.05)
+    assert result.time < 1.0 and result.bestMove is not None
+
+def test_TranspositionTable():
+    from chupochess.common import Move
+    from chupochess.transposition import TranspositionTable, EXACT, LOWER, UPPER, BUCKET_SIZE
+    table = TranspositionTable(1)
+    assert table.size == 1024 * 1024 // 16 and len(table.keys) == len(table.data) == table.size
+    move = Move.fromString("A7A8N")
+    table.store(12345, 7, -99990, LOWER, move)
+    assert table.probe(12345) == (7, -99990, LOWER, move)
+    assert table.probe(12346) is None
+    # an update without best move keeps the stored one:
+    table.store(12345, 8, 15, EXACT)
+    assert table.probe(12345) == (8, 15, EXACT, move)
+    # full bucket: the shallowest entry is replaced, entries of earlier searches first
+    keys = [3 + index * table.buckets for index in range(BUCKET_SIZE + 2)]       # all map to the same bucket
+    for depth, key in enumerate(keys[:BUCKET_SIZE]):
+        table.store(key, depth + 1, 0, UPPER)
+    table.store(keys[BUCKET_SIZE], 10, 0, EXACT)
+    assert table.probe(keys[0]) is None and table.probe(keys[1]) is not None
+    table.newSearch()
+    table.store(keys[BUCKET_SIZE + 1], 1, 0, EXACT)
+    assert table.probe(keys[1]) is None and table.probe(keys[BUCKET_SIZE]) is not None
+    table.clear()
+    assert table.probe(keys[BUCKET_SIZE]) is None and table.hashfull() == 0
+
+def test_search_transpositionTable():
+    from chupochess.board import Board
+    from chupochess.search import Search
+    from chupochess.transposition import TranspositionTable
+    table = TranspositionTable(1)
+    search = Search(Board(), table)
+    first = search.search(depth=4)
+    assert table.hashfull() > 0
+    # the second search finds its results in the table:
+    second = search.search(depth=4)
+    assert second.score == first.score and second.bestMove == first.bestMove
+    assert second.nodes < first.nodes
+
+def test_evaluation_incremental():
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.evaluation import computeEvaluation, evaluate, PIECE_VALUES
+    board = Board()
+    assert board.evaluationScore == 0 == computeEvaluation(board)
+    # captures, castling, en passant and promotion all go through the board's placement hooks:
+    board = Board.fromFEN("r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1")
+    start = board.evaluationScore
+    for move in ["E5D6", "E8G8", "B7A8Q", "F8A8", "E1C1"]:
+        board.push(Move.fromString(move))
+        assert board.evaluationScore == computeEvaluation(board)
+    assert evaluate(board) == -board.evaluationScore          # black to move
+    while board.moveStack:
+        board.pop()
+    assert board.evaluationScore == start
+    # mirrored positions evaluate symmetrically:
+    assert Board.fromFEN("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1").evaluationScore == -Board.fromFEN("4k3/8/8/3n4/8/8/8/4K3 w - - 0 1").evaluationScore
+    assert Board.fromFEN("4k3/8/8/8/8/8/8/3QK3 w - - 0 1").evaluationScore > PIECE_VALUES["Q"] - 50
+
+def test_staticExchange():
+    from chupochess.board import Board
+    from chupochess.common import Move
+    def exchange(fen: str, move: str) -> int:
+        move = Move.fromString(move)
+        return Board.fromFEN(fen).bitboards.staticExchange(move.fromLocation.index, move.toLocation.index)
+    assert exchange("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "E1E5") == 100           # undefended pawn
+    assert exchange("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "D3E5") == -220   # knight for pawn
+    assert exchange("4k3/8/2p5/3p4/4P3/8/8/4K3 w - - 0 1", "E4D5") == 0                          # pawn for pawn
+    assert exchange("3rk3/3r4/8/3q4/8/8/3R4/4K3 w - - 0 1", "D2D5") == 400                       # queen for rook
+    assert exchange("3rk3/8/8/3q4/8/8/3R4/3RK3 w - - 0 1", "D2D5") == 900                        # x-ray rook behind rook
+    assert exchange("3rk3/8/8/3p4/8/8/3Q4/3RK3 w - - 0 1", "D2D5") == -300                       # x-ray rook behind queen
+    assert exchange("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "E5D6") == 100                          # en passant
+    assert exchange("4k3/8/4p3/3p4/4K3/8/8/8 w - - 0 1", "E4D5") < -10000                        # king into a defended square
+
+def test_search_quiescence():
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.search import Search
+    from chupochess.transposition import TranspositionTable
+    # the defended pawn is poisoned: depth 1 alone would take it, the quiescence search sees the recapture
+    board = Board.fromFEN("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1")
+    result = Search(board, TranspositionTable(1)).search(depth=1)
+    assert result.bestMove != Move.fromString("D1D5")
+    assert result.score < 800                   # a queen against two pawns, no pawn won
+    # hanging queen is taken, even at depth 1 the result is stable after the exchanges:
+    board = Board.fromFEN("4k3/8/8/3q4/8/8/3R4/3RK3 w - - 0 1")
+    result = Search(board, TranspositionTable(1)).search(depth=1)
+    assert result.bestMove == Move.fromString("D2D5") and result.score > 800
+    # every visited position is counted once, also at the horizon where the quiescence search starts:
+    board = Board.fromFEN("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    pushes = []
+    push = board.push
+    board.push = lambda move: pushes.append(move) or push(move)
+    result = Search(board, TranspositionTable(1)).search(depth=2)
+    assert result.nodes == len(pushes) + 2          # + the root, searched in both iterations
+
+def test_parallelSearch():
+    import pytest
+    from multiprocessing import shared_memory
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.parallel import ParallelSearch, _searchWorker
+    from chupochess.transposition import TranspositionTable, getTableBytes, EXACT
+    # tables on the same shared memory see each other's entries:
+    memory = shared_memory.SharedMemory(create=True, size=getTableBytes(1))
+    first, second = TranspositionTable(1, memory.buf), TranspositionTable(1, memory.buf)
+    first.store(2 ** 64 - 5, 3, -7, EXACT, Move.fromString("E2E4"))
+    assert second.probe(2 ** 64 - 5) == (3, -7, EXACT, Move.fromString("E2E4"))
+    del first, second
+    memory.close()
+    memory.unlink()
+    # two worker processes on one root position:
+    board = Board.fromFEN("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    depths = []
+    with ParallelSearch(board, processes=2, sizeMB=1) as search:
+        result = search.search(depth=3, callback=lambda info: depths.append(info.depth))
+        assert result.bestMove == Move.fromString("A1A8") and result.depth >= 1
+        assert depths and result.nodes > 0
+        result = search.search(nodes=400)
+        assert result.bestMove is not None and result.nodes <= 400
+        assert search.table.hashfull() >= 0
+    assert len(board.moveStack) == 0
+    # a failing worker reports its own error, the shared memory is released nevertheless:
+    memory = shared_memory.SharedMemory(create=True, size=getTableBytes(1))
+    with pytest.raises(AttributeError):
+        _searchWorker(0, board.toFEN(), board.keyHistory, memory.name, 1, 1, (1, None, None), None, None)
+    memory.close()
+    memory.unlink()
+
+def test_uci():
+    import threading
+    from chupochess.uci import UCIEngine
+    lines = []
+    engine = UCIEngine(lines.append)
+    for command in ["uci", "isready", "setoption name Hash value 2", "position startpos moves e2e4 e7e5 g1f3"]:
+        assert engine.handle(command)
+    assert lines[-2:] == ["uciok", "readyok"]
+    assert engine.table.size == 2 * 1024 * 1024 // 16
+    assert engine.board.toFEN() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    # search to a fixed depth, reported with info lines and the best move:
+    engine.handle("position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    engine.handle("go depth 3")
+    engine.waitForSearch()
+    assert lines[-1] == "bestmove a1a8"
+    assert lines[-2].startswith("info depth 1 score mate 1 ") and lines[-2].endswith(" pv a1a8")
+    # an infinite search only answers after 'stop', 'isready' is answered in between:
+    del lines[:]
+    engine.handle("position startpos")
+    engine.handle("go infinite")
+    engine.handle("isready")
+    assert "readyok" in lines
+    engine.handle("stop")
+    assert lines[-1].startswith("bestmove ") and len(lines[-1]) == len("bestmove e2e4")
+    # commands arriving during an infinite search end it (the thread reading 'stop' would be blocked otherwise):
+    for command in ["position startpos moves e2e4", "go depth 1", "ucinewgame", "setoption name Hash value 1"]:
+        del lines[:]
+        engine.handle("go infinite")
+        handler = threading.Thread(target=engine.handle, args=(command,), daemon=True)
+        handler.start()
+        handler.join(5)
+        assert not handler.is_alive()
+        engine.waitForSearch()
+        assert len([line for line in lines if line.startswith("bestmove ")]) == 1 + (command == "go depth 1")
+    # bad input is reported and ignored:
+    engine.handle("position startpos moves e2e4")
+    del lines[:]
+    for command in ["setoption name Hash value abc", "setoption name BookFile value /nonexistent/book.bin",
+                    "position startpos moves e2e5", "position startpos moves zz", "position startpos moves e2",
+                    "position fen 8/8/8/8/8/8/8/8 w - - 0 1"]:
+        assert engine.handle(command)
+    assert len(lines) == 6 and all(line.startswith("info string ") for line in lines)
+    assert engine.hashMB == 1 and engine.book is None
+    assert engine.board.toFEN() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+    # clock based time limit, parallel search; the shared table is kept between moves:
+    engine.handle("setoption name Threads value 2")
+    table = engine.table
+    engine.handle("go wtime 300 btime 300 nodes 500")
+    engine.waitForSearch()
+    assert lines[-1].startswith("bestmove ")
+    engine.handle("go depth 1")
+    engine.waitForSearch()
+    assert engine.table is table and any(table.data)
+    engine.handle("ucinewgame")
+    assert not any(table.data)
+    assert not engine.handle("quit")
+
+def test_polyglotBook(tmp_path):
+    import random
+    from chupochess.board import Board
+    from chupochess.common import Move
+    from chupochess.polyglot import PolyglotBook, computePolyglotKey, encodeMove, writeBook
+    from chupochess.uci import UCIEngine
+    # reference keys of the Polyglot format specification:
+    board = Board()
+    assert computePolyglotKey(board) == 0x463b96181691fc9c
+    for move, key in [("E2E4", 0x823c9b50fd114196), ("D7D5", 0x0756b94461c50fb0), ("E4E5", 0x662fafb965db29d4),
+                      ("F7F5", 0x22a48b5a8e47ff78), ("E1E2", 0x652a607ca3f242c1), ("E8F7", 0x00fdd303c946bdd9)]:
+        board.push(Move.fromString(move))
+        assert computePolyglotKey(board) == key
+    # castling is stored as "king takes rook":
+    castling = Board.fromFEN("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert encodeMove(castling, Move.fromString("E1G1")) == (7 | (4 << 6))
+    start = Board()
+    path = str(tmp_path / "book.bin")
+    writeBook(path, [(computePolyglotKey(start), encodeMove(start, Move.fromString("E2E4")), 3, 0),
+                     (computePolyglotKey(start), encodeMove(start, Move.fromString("D2D4")), 1, 0),
+                     (computePolyglotKey(castling), encodeMove(castling, Move.fromString("E1C1")), 1, 0),
+                     (1, 0, 1, 0), (2 ** 64 - 1, 0, 1, 0)])
+    with PolyglotBook(path) as book:
+        assert book.size == 5
+        assert [(str(move), weight) for move, weight, learn in book.getEntries(start)] == [("E2E4", 3), ("D2D4", 1)]
+        assert [entry[0] for entry in book.getEntries(castling)] == [Move.fromString("E1C1")]
+        assert book.getEntries(Board.fromFEN("4k3/8/8/8/8/8/8/4K3 w - - 0 1")) == []
+        rng = random.Random(1)
+        moves = [str(book.getMove(start, rng)) for _ in range(400)]
+        assert 250 < moves.count("E2E4") < 350 and moves.count("E2E4") + moves.count("D2D4") == 400
+    # the UCI front end plays book moves without searching:
+    lines = []
+    engine = UCIEngine(lines.append)
+    engine.handle("setoption name BookFile value " + path)
+    engine.handle("position startpos")
+    engine.handle("go depth 3")
+    assert lines[-1] in ["bestmove e2e4", "bestmove d2d4"]
+    engine.book.close()
+
+def test_tablebase(tmp_path):
+    from chupochess.board import Board
+    from chupochess.search import Search, MATE_SCORE
+    from chupochess.tablebase import Tablebase, main, HEADER_SIZE
+    main(["--directory", str(tmp_path), "--tables", "KRK"])
+    tablebase = Tablebase(str(tmp_path))
+    assert max(tablebase._getTable("KRK")[HEADER_SIZE:]) - 1 == 32                               # KRK: mate in 16 at most
+    assert tablebase.probe(Board.fromFEN("k7/8/1K6/8/8/8/8/7R w - - 0 1")) == (1, 1)
+    assert tablebase.probe(Board.fromFEN("K7/8/1k6/8/8/8/8/7r b - - 0 1")) == (1, 1)      # black strong side
+    assert tablebase.probe(Board.fromFEN("k6R/8/1K6/8/8/8/8/8 b - - 0 1")) == (-1, 0)     # mated
+    assert tablebase.probe(Board.fromFEN("8/8/8/8/8/8/1k6/R3K3 b - - 0 1"))[0] == 0       # rook falls
+    assert tablebase.probe(Board.fromFEN("k7/8/1K6/8/8/8/8/7Q w - - 0 1")) is None        # no KQK table
+    assert tablebase.probe(Board()) is None
+    # the search plays the ending from the table:
+    board = Board.fromFEN("8/8/8/4k3/8/8/8/R3K3 w - - 0 1")
+    result = Search(board, tablebase=tablebase).search(depth=2)
+    assert result.score == MATE_SCORE - tablebase.probe(board)[1]
+    tablebase.close()
+
+def test_Board_cachedGameState():
+    from chupochess.board import Board
+    from chupochess.common import Move, GameState, BoardBackend
+    for backend in BoardBackend:
+        board = Board(backend)
+        calls = []
+        generate = board.bitboards.generateLegalMoves
+        board.bitboards.generateLegalMoves = lambda *args: calls.append(args) or generate(*args)
+        moves = board.getLegalMoves()
+        assert len(moves) == 20 and board.getLegalMoves() is moves and len(calls) == 1
+        for move in ["F2F3", "E7E5", "G2G4"]:
+            board.push(Move.fromString(move))
+            board.updateGameState()
+            board.updateGameState()
+        assert board.gameState == GameState.RUNNING
+        assert len(board.getLegalMoves()) == 30
+        board.push(Move.fromString("D8H4"))
+        board.updateGameState()
+        assert board.gameState == GameState.BLACK_WINS and board.getLegalMoves() == []
+        count = len(calls)
+        for _ in range(10):
+            board.updateGameState()                 # idle GUI frames: nothing is recomputed
+        assert len(calls) == count
+        board.pop()
+        assert len(board.getLegalMoves()) == 30 and board.gameState == GameState.RUNNING
+
+def test_Board_validMovesCache():
+    from chupochess.board import Board
+    from chupochess.common import Move, Location, File, BoardBackend
+    for backend in BoardBackend:
+        board = Board(backend)
+        knight = Location(0, File.G)
+        moves = board.getValidMoves(knight)
+        assert sorted(str(move) for move in moves) == ["F3", "H3"]
+        assert board.getValidMoves(knight) is moves
+        assert (board.validMovesHits, board.validMovesMisses) == (1, 1)
+        board.push(Move.fromString("E2E4"))
+        assert board.getValidMoves(knight) is not moves                     # invalidated by the move
+        assert sorted(str(move) for move in board.getValidMoves(Location(0, File.F))) == ["A6", "B5", "C4", "D3", "E2"]
+        assert (board.validMovesHits, board.validMovesMisses) == (1, 3)
+        board.pop()
+        assert sorted(str(move) for move in board.getValidMoves(Location(0, File.F))) == []
+        assert board.getValidMoves(Location(3, File.E)) == []               # empty square
+        assert board.validMovesMisses == 5
+
+def test_Board_snapshot():
+    from chupochess.board import Board
+    from chupochess.common import Move, BoardBackend
+    from chupochess.perft import perft
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    board = Board.fromFEN(fen)
+    for move in ["E1G1", "A6F1", "G1F1", "C7C5", "D5C6"]:          # castling, capture, en passant
+        board.push(Move.fromString(move))
+    clone = board.clone()
+    assert clone.toFEN() == board.toFEN() and clone.zobristKey == board.zobristKey
+    assert clone.evaluationScore == board.evaluationScore and clone.bitboards.pieces == board.bitboards.pieces
+    assert clone.keyHistory == board.keyHistory and clone.positionCounts == board.positionCounts
+    assert [piece.name for piece in clone.whitePieces] == [piece.name for piece in board.whitePieces]
+    assert perft(clone, 2) == perft(board, 2)
+    clone.push(Move.fromString("C6B7"))
+    assert clone.toFEN() != board.toFEN()                           # independent of the original
+    # restore onto a board that moved on:
+    snapshot = board.snapshot()
+    fenBefore = board.toFEN()
+    for move in ["C6B7", "E8G8", "B7A8Q"]:                           # capture, castling, promotion
+        board.push(Move.fromString(move))
+    board.restore(snapshot)
+    assert board.toFEN() == fenBefore and board.zobristKey == clone.keyHistory[-2]
+    assert board.moveStack == [] and board.getRepetitionCount() == 1
+    assert len(board.getLegalMoves()) == len(Board.fromFEN(fenBefore).getLegalMoves())
+    board.restore(Board.fromFEN(fen, BoardBackend.BITBOARD).snapshot())
+    assert board.toFEN() == fen and board.fullmoveNumber == 1
+
+def test_Pawn_promotedRookCastling():
+    from chupochess.board import Board
+    from chupochess.common import Move, Location, File, BoardBackend
+    for backend in BoardBackend:
+        board = Board.fromFEN("r3k3/8/8/8/7K/8/2p5/8 b q - 0 1", backend)
+        board.push(Move.fromString("C2C1R"))
+        assert not board.getSquare(Location(0, File.C)).currentPiece.isFirstMove
+        board.push(Move.fromString("H4H5"))
+        moves = [str(move) for move in board.getValidMoves(Location(7, File.E))]
+        assert "C8" in moves and "G8" not in moves          # only the rook that never moved can castle
+
+def test_uci_process():
+    import os
+    import queue
+    import subprocess
+    import sys
+    import threading
+    # the engine as started by a GUI, reading stdin while worker processes search (Threads > 1):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, "-m", "chupochess.uci"], cwd=root, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, text=True)
+    output = queue.Queue()
+    threading.Thread(target=lambda: [output.put(line.strip()) for line in process.stdout], daemon=True).start()
+    try:
+        def send(command: str) -> None:
+            process.stdin.write(command + "\n")
+            process.stdin.flush()
+
+        def readUntil(prefix: str) -> list:
+            lines = []
+            while not lines or not lines[-1].startswith(prefix):
+                lines.append(output.get(timeout=60))        # queue.Empty: the engine hangs
+            return lines
+        send("uci")
+        readUntil("uciok")
+        send("setoption name Threads value 2")
+        send("setoption name Hash value 1")
+        # every search reaches its depth, a stop after the previous search must not cut the next one short:
+        for moves in ["", " moves e2e4", " moves e2e4 e7e5"]:
+            send("position startpos" + moves)
+            send("go depth 4")
+            lines = readUntil("bestmove ")
+            assert lines[-2].startswith("info depth 4 ")
+        send("quit")
+        assert process.wait(timeout=60) == 0
+    finally:
+        process.kill()